@@ -0,0 +1,106 @@
+"""
+Conditional GET support (ETag / Last-Modified).
+
+Validators are computed from a cheap fingerprint of the data a response
+is built from, so a request whose If-None-Match / If-Modified-Since still
+matches is answered with 304 before anything is fetched or serialized.
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Hash ``parts`` into a strong ETag value."""
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Add the ETag / Last-Modified headers (``last_modified`` is a datetime)
+    and ask clients to revalidate before reusing their copy.
+    """
+    response['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def not_modified_response(request, etag, last_modified=None):
+    """Return a 304 (or 412) response if the request's preconditions allow it, else None."""
+    response = get_conditional_response(
+        request,
+        etag=quote_etag(etag),
+        last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding ETag / Last-Modified validators to list and
+    retrieve. The validators come from the row count and latest
+    ``updated_at`` of the filtered queryset, plus the latest ``updated_at``
+    of each model in ``conditional_related_models`` (models whose values
+    the serializer shows), plus today's date for the values serializers
+    derive from it. Every timestamp is read through an index.
+    """
+    conditional_related_models = []
+
+    def get_conditional_related_models(self):
+        return self.conditional_related_models
+
+    def get_validators(self, queryset):
+        """Get (etag, last_modified) for a response built from ``queryset``."""
+        state = queryset.order_by().aggregate(count=Count('pk'), last=Max('updated_at'))
+        timestamps = [state['last']] + [
+            model.objects.aggregate(last=Max('updated_at'))['last']
+            for model in self.get_conditional_related_models()
+        ]
+
+        # Values like is_overdue and days_until_deadline change at midnight
+        # without any row changing
+        now = timezone.now()
+        etag = make_etag(
+            self.request.get_full_path(),
+            self.request.accepted_media_type,
+            state['count'],
+            now.date().isoformat(),
+            *timestamps
+        )
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        last_modified = max((timestamp for timestamp in timestamps if timestamp), default=None)
+        return etag, max(last_modified, midnight) if last_modified else None
+
+    def respond_conditionally(self, validators, view, request, *args, **kwargs):
+        """Answer with 304 if the client's copy is current, otherwise call ``view`` and add the validators."""
+        if validators is None:
+            return view(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        response = not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = set_validators(view(request, *args, **kwargs), etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_validators(self.filter_queryset(self.get_queryset()))
+        return self.respond_conditionally(validators, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            validators = self.get_validators(self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ))
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup value; retrieve() turns it into a 404
+            validators = None
+        return self.respond_conditionally(validators, super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,110 @@
+"""
+Sparse fieldsets: ``?fields=a,b`` keeps only the listed fields of a read
+response and ``?exclude=a,b`` drops the listed ones.
+
+Omitted fields are removed from the serializer, so their
+SerializerMethodFields are never computed, and the queryset defers the
+columns that only omitted fields read. Views can also skip annotations and
+joins nobody asked for with ``wants_fields()``.
+"""
+from rest_framework.permissions import SAFE_METHODS
+
+
+SPARSE_FIELDS_PARAM = 'fields'
+SPARSE_EXCLUDE_PARAM = 'exclude'
+
+
+def parse_field_names(value):
+    """Split a comma-separated list of field names."""
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def select_fields(names, query_params):
+    """Get the ``names`` kept by the ?fields= and ?exclude= parameters, in order."""
+    names = list(names)
+    if SPARSE_FIELDS_PARAM in query_params:
+        kept = parse_field_names(query_params[SPARSE_FIELDS_PARAM])
+        names = [name for name in names if name in kept]
+    if SPARSE_EXCLUDE_PARAM in query_params:
+        excluded = parse_field_names(query_params[SPARSE_EXCLUDE_PARAM])
+        names = [name for name in names if name not in excluded]
+    return names
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer mixin removing the fields a sparse fieldset leaves out, when
+    its view applies one (see SparseFieldsetMixin). ``sparse_dependencies``
+    names the model fields read by each SerializerMethodField.
+    """
+    sparse_dependencies = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        view = self.context.get('view')
+        if view is not None and getattr(view, 'sparse_fieldset_applies', None) and view.sparse_fieldset_applies():
+            shown = set(select_fields(self.fields, view.request.query_params))
+            for name in list(self.fields):
+                if name not in shown:
+                    self.fields.pop(name)
+
+    @classmethod
+    def get_field_dependencies(cls, name, field):
+        """Get the model fields serializer field ``name`` reads."""
+        if field.source == '*':
+            return cls.sparse_dependencies.get(name, ())
+        # Only the first step of a dotted source lives on this model
+        return [field.source.split('.')[0]]
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin applying sparse fieldsets to the read actions in
+    ``sparse_fieldset_actions``. get_queryset() should pass its result
+    through sparse_queryset() and may check wants_fields() before adding
+    annotations or joins.
+    """
+    sparse_fieldset_actions = ['list', 'retrieve']
+
+    def sparse_fieldset_applies(self):
+        """Whether this request asks for a sparse fieldset the view supports."""
+        params = self.request.query_params
+        return (
+            self.request.method in SAFE_METHODS
+            and self.action in self.sparse_fieldset_actions
+            and (SPARSE_FIELDS_PARAM in params or SPARSE_EXCLUDE_PARAM in params)
+        )
+
+    def get_sparse_fields(self):
+        """Get {name: field} for every field of the serializer, and the names shown."""
+        if not hasattr(self, '_sparse_fields'):
+            fields = self.get_serializer_class()().fields
+            self._sparse_fields = fields, set(select_fields(fields, self.request.query_params))
+        return self._sparse_fields
+
+    def wants_fields(self, *names):
+        """Whether the response shows any of the serializer fields ``names``."""
+        if not self.sparse_fieldset_applies():
+            return True
+        _, shown = self.get_sparse_fields()
+        return any(name in shown for name in names)
+
+    def sparse_queryset(self, queryset):
+        """Defer the model columns that only the omitted serializer fields read."""
+        if not self.sparse_fieldset_applies():
+            return queryset
+
+        serializer_class = self.get_serializer_class()
+        fields, shown = self.get_sparse_fields()
+
+        # Pagination orders (and builds its cursor) on these
+        ordering = getattr(self, 'keyset_ordering', None) or queryset.model._meta.ordering
+        needed = {name.lstrip('-') for name in ordering}
+        omitted = set()
+        for name, field in fields.items():
+            dependencies = serializer_class.get_field_dependencies(name, field)
+            (needed if name in shown else omitted).update(dependencies)
+
+        columns = {field.name for field in queryset.model._meta.concrete_fields if not field.primary_key}
+        deferred = (omitted & columns) - needed
+        return queryset.defer(*sorted(deferred)) if deferred else queryset
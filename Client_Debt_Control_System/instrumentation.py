@@ -0,0 +1,155 @@
+"""
+Per-request SQL and timing instrumentation.
+
+RequestTimingMiddleware counts every SQL statement a request runs (through
+``connection.execute_wrapper``) and times the database, the serializers
+and the view. The figures are sent back in a ``Server-Timing`` header, and
+requests slower than SLOW_REQUEST_THRESHOLD_MS are written to the slow
+request log together with the statements they repeated most.
+"""
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """SQL statements and named timings collected while serving one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.statement_time = defaultdict(float)
+        self.timings = defaultdict(float)
+        self._running = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper timing each statement."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += duration
+            self.statements[sql] += 1
+            self.statement_time[sql] += duration
+
+    def repeated_statements(self, limit):
+        """Get up to ``limit`` statements run more than once, most repeated first."""
+        repeated = [
+            {'sql': sql, 'count': count, 'total_ms': round(self.statement_time[sql] * 1000, 2)}
+            for sql, count in self.statements.most_common()
+            if count > 1
+        ]
+        return repeated[:limit]
+
+
+def get_request_metrics():
+    """Get the metrics of the request being served, or None outside of one."""
+    return _current_metrics.get()
+
+
+@contextmanager
+def collect_metrics():
+    """Record the SQL run on every connection inside the block; yields the RequestMetrics."""
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent inside the block to timing ``name`` of the current
+    request. Nested blocks with the same name are only counted once.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or name in metrics._running:
+        yield
+        return
+
+    metrics._running.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[name] += time.perf_counter() - started
+        metrics._running.discard(name)
+
+
+class TimedSerializerMixin:
+    """Serializer mixin counting validation and representation towards the "serializer" timing."""
+
+    def run_validation(self, *args, **kwargs):
+        with timed('serializer'):
+            return super().run_validation(*args, **kwargs)
+
+    def to_representation(self, instance):
+        with timed('serializer'):
+            return super().to_representation(instance)
+
+
+def server_timing(metrics):
+    """Format ``metrics`` as a Server-Timing header value."""
+    entries = [f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"']
+    entries += [f'{name};dur={duration * 1000:.2f}' for name, duration in metrics.timings.items()]
+    return ', '.join(entries)
+
+
+class RequestTimingMiddleware:
+    """
+    Instrument each request (see the module docstring). Keep it last in
+    MIDDLEWARE so the "view" timing covers URL resolution, the view and
+    rendering only. Rows fetched while a streaming response is being sent
+    are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_metrics() as metrics:
+            with timed('view'):
+                response = self.get_response(request)
+
+        header = server_timing(metrics)
+        if response.has_header('Server-Timing'):
+            header = f"{response['Server-Timing']}, {header}"
+        response['Server-Timing'] = header
+
+        threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', None)
+        duration_ms = metrics.timings['view'] * 1000
+        if threshold is not None and duration_ms >= threshold:
+            self.log_slow_request(request, response, metrics, duration_ms)
+        return response
+
+    def log_slow_request(self, request, response, metrics, duration_ms):
+        entry = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'serializer_ms': round(metrics.timings['serializer'] * 1000, 2),
+            'queries': metrics.queries,
+            'repeated_queries': metrics.repeated_statements(getattr(settings, 'SLOW_REQUEST_TOP_QUERIES', 5)),
+        }
+        logger.warning('Slow request %s', json.dumps(entry), extra={'slow_request': entry})
@@ -0,0 +1,123 @@
+"""
+Opt-in per-request profiling.
+
+ProfilingMiddleware runs a DRF view under cProfile when a staff user asks
+for it (``X-Profile: 1`` header or ``?profile=1``) or when the request is
+picked by PROFILE_SAMPLE_RATE. Each profile is written to PROFILE_DIR as a
+``.pstats`` file, loadable with pstats or snakeviz, next to a ``.txt``
+summary of the functions with the most cumulative time in each app.
+"""
+import cProfile
+import logging
+import pstats
+import random
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+
+logger = logging.getLogger(__name__)
+
+PROFILED_APPS = ('clients', 'debts', 'payments', 'notifications', 'report')
+
+PROFILE_REQUEST_VALUES = ('1', 'true', 'yes')
+
+
+def get_app(filename):
+    """Get which of PROFILED_APPS the source file ``filename`` belongs to, if any."""
+    try:
+        parts = Path(filename).resolve().relative_to(settings.BASE_DIR).parts
+    except (OSError, ValueError):
+        return None
+    return parts[0] if len(parts) > 1 and parts[0] in PROFILED_APPS else None
+
+
+def summarize(stats, top=20):
+    """
+    Get the ``top`` functions by cumulative time of each app, as
+    {app: [(cumulative_ms, calls, function), ...]}.
+    """
+    by_app = defaultdict(list)
+    for (filename, line, function), (_, calls, _, cumulative, _) in stats.stats.items():
+        app = get_app(filename)
+        if app is not None:
+            by_app[app].append((round(cumulative * 1000, 2), calls, f'{filename}:{line}({function})'))
+
+    return {
+        app: sorted(by_app[app], reverse=True)[:top]
+        for app in PROFILED_APPS
+        if by_app[app]
+    }
+
+
+def format_summary(request, response, stats, top=20):
+    lines = [
+        f'{request.method} {request.get_full_path()} -> {response.status_code}',
+        f'{stats.total_calls} function calls in {stats.total_tt * 1000:.2f} ms',
+    ]
+    for app, functions in summarize(stats, top).items():
+        lines += ['', f'[{app}]', f'{"cumulative ms":>14} {"calls":>8}  function']
+        lines += [f'{cumulative:>14.2f} {calls:>8}  {function}' for cumulative, calls, function in functions]
+    return '\n'.join(lines) + '\n'
+
+
+def dump_profile(profiler, request, response):
+    """Write the profile of ``request`` to PROFILE_DIR; returns the file name without extension."""
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    path = slugify(request.path.replace('/', ' '))
+    name = f'{timezone.now():%Y%m%dT%H%M%S%f}-{request.method.lower()}-{path}'
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(directory / f'{name}.pstats')
+    (directory / f'{name}.txt').write_text(
+        format_summary(request, response, stats, getattr(settings, 'PROFILE_TOP_FUNCTIONS', 20))
+    )
+    return name
+
+
+class ProfilingMiddleware:
+    """
+    Profile DRF views on request (see the module docstring). Keep it last
+    in MIDDLEWARE, since the other middleware's process_view hooks (CSRF)
+    have to run before it calls the view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def should_profile(self, request):
+        requested = request.headers.get('X-Profile') or request.GET.get('profile')
+        if requested and requested.lower() in PROFILE_REQUEST_VALUES:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_staff:
+                return True
+
+        rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0)
+        return rate > 0 and random.random() < rate
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not hasattr(view_func, 'cls') or not self.should_profile(request):
+            return None
+
+        def view():
+            response = view_func(request, *view_args, **view_kwargs)
+            # Rendering is part of the cost of a DRF response
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            return response
+
+        profiler = cProfile.Profile()
+        response = profiler.runcall(view)
+
+        try:
+            response['X-Profile-Id'] = dump_profile(profiler, request, response)
+        except OSError:
+            logger.exception('Could not write the profile of %s %s', request.method, request.path)
+        return response
@@ -0,0 +1,126 @@
+"""
+Read replica routing.
+
+Views opt in by listing the actions (for ViewSets) or handler methods (for
+APIViews) that only read in ``replica_actions``. ReplicaRoutingMiddleware
+sends the ORM reads of those requests to the REPLICA_DATABASE alias, while
+every write, and every read of any other request, stays on ``default``.
+
+A request that writes pins its client to ``default`` for REPLICA_PIN_SECONDS
+through a cookie, so it reads its own writes while the replica catches up.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+REPLICA_PIN_COOKIE = 'replica_pin'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_database = ContextVar('read_database', default=None)
+
+
+def get_replica_alias():
+    """Get the alias of the read replica, or None when there is none configured."""
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def get_read_database():
+    """Get the alias the ORM reads of the ledger apps currently go to."""
+    return _read_database.get() or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def read_from(alias):
+    """Route the ORM reads made inside the block to database ``alias`` (None for default)."""
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Route reads of the ledger apps to the database chosen by read_from(),
+    everything else (sessions, auth, writes, migrations) to ``default``.
+    """
+    route_app_labels = {'clients', 'debts', 'payments', 'notifications'}
+
+    def db_for_read(self, model, **hints):
+        alias = _read_database.get()
+        if alias and model._meta.app_label in self.route_app_labels:
+            return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Also for instances that were read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of default (see refresh_replica), never migrated itself
+        return db != get_replica_alias()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Apply read_from() to requests for views that opted in (see the module
+    docstring), including the content of streaming responses, and pin
+    clients that write to ``default``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.read_database = None
+        request._read_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            # Set by process_view for views reading from the replica
+            if request._read_token is not None:
+                _read_database.reset(request._read_token)
+
+        if request.read_database and response.streaming:
+            response.streaming_content = self.stream_from(request.read_database, response.streaming_content)
+
+        if request.method not in SAFE_METHODS:
+            pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 0)
+            if pin_seconds and get_replica_alias():
+                response.set_cookie(REPLICA_PIN_COOKIE, '1', max_age=pin_seconds, httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        alias = get_replica_alias()
+        if (
+            alias is None
+            or request.method not in SAFE_METHODS
+            or REPLICA_PIN_COOKIE in request.COOKIES
+        ):
+            return None
+
+        view_class = getattr(view_func, 'cls', None)
+        actions = getattr(view_func, 'actions', None) or {}
+        handler = actions.get(request.method.lower(), request.method.lower())
+        if handler in getattr(view_class, 'replica_actions', ()):
+            # Load the session user from default first, so a client the
+            # replica has not caught up with yet stays logged in
+            user = getattr(request, 'user', None)
+            if user is not None:
+                user.is_authenticated
+            request.read_database = alias
+            request._read_token = _read_database.set(alias)
+        return None
+
+    def stream_from(self, alias, content):
+        with read_from(alias):
+            yield from content
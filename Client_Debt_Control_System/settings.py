@@ -42,7 +42,8 @@ INSTALLED_APPS = [
     'debts',
     'payments',
     'notifications',
-    'report'
+    'report',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
@@ -53,6 +54,10 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'debts.middleware.OverdueSweepMiddleware',
+    'Client_Debt_Control_System.routers.ReplicaRoutingMiddleware',
+    'Client_Debt_Control_System.instrumentation.RequestTimingMiddleware',
+    'Client_Debt_Control_System.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'Client_Debt_Control_System.urls'
@@ -82,9 +87,26 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so concurrent
+            # writers queue up (payments.services) instead of failing with
+            # "database is locked" when upgrading a read lock
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # Read-only copy of default for reports and list GETs; locally a second
+    # SQLite file refreshed with `manage.py refresh_replica`.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['Client_Debt_Control_System.routers.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,3 +148,62 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'Client_Debt_Control_System.pagination.KeysetPagination',
+}
+
+# Caching
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Cache alias holding report responses and the ledger version behind the
+# report ETags (see report/cache.py). A locmem cache only sees writes made
+# by its own process; point this at a FileBasedCache or DatabaseCache entry
+# when running several processes.
+REPORT_CACHE_ALIAS = 'default'
+
+# Seconds a report may be served from cache; writes to clients, debts and
+# payments invalidate it sooner.
+REPORT_CACHE_TIMEOUT = 60 * 5
+
+# Seconds between overdue sweeps triggered from incoming requests
+# (see debts.middleware.OverdueSweepMiddleware); 0 disables them.
+OVERDUE_SWEEP_INTERVAL = 60 * 5
+
+# Requests taking at least this many milliseconds are logged with their SQL
+# statistics to the Client_Debt_Control_System.instrumentation logger (see
+# RequestTimingMiddleware); None disables the slow request log.
+SLOW_REQUEST_THRESHOLD_MS = 500
+
+# How many of the most repeated SQL statements a slow request entry lists.
+SLOW_REQUEST_TOP_QUERIES = 5
+
+# Per-request profiling (see Client_Debt_Control_System.profiling). Staff
+# users can ask for a profile with an "X-Profile: 1" header or ?profile=1;
+# besides those, this fraction of requests is profiled (0.01 = 1%).
+PROFILE_SAMPLE_RATE = 0
+
+# Where the .pstats files and their summaries are written, and how many
+# functions each app lists in a summary.
+PROFILE_DIR = BASE_DIR / 'profiles'
+PROFILE_TOP_FUNCTIONS = 20
+
+# Database alias that safe read-only views read from (see
+# Client_Debt_Control_System.routers); None keeps every read on default.
+# Only enable it once the replica is kept up to date, e.g. by running
+# refresh_replica from cron.
+REPLICA_DATABASE = None
+
+# Seconds a client keeps reading from default after a write, so it sees
+# its own changes while the replica catches up.
+REPLICA_PIN_SECONDS = 30
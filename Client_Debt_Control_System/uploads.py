@@ -0,0 +1,163 @@
+"""
+Streaming readers for bulk CSV / JSON Lines uploads, and the chunked
+import loop and report shared by the apps that import them.
+"""
+import csv
+import json
+from itertools import islice
+
+
+UPLOAD_FORMATS = ('csv', 'jsonl')
+
+MAX_REPORTED_ERRORS = 1000
+
+
+def get_upload_format(uploaded_file, requested=None):
+    """Get the upload format from ``requested`` or the file name/content type."""
+    if requested:
+        requested = requested.lower()
+        return 'jsonl' if requested in ('ndjson', 'json') else requested
+
+    name = (uploaded_file.name or '').lower()
+    content_type = (getattr(uploaded_file, 'content_type', None) or '').lower()
+    if name.endswith(('.jsonl', '.ndjson', '.json')) or 'json' in content_type:
+        return 'jsonl'
+    return 'csv'
+
+
+def iter_upload_lines(uploaded_file):
+    """
+    Yield (line_number, text, error) for each line of an uploaded file.
+    ``text`` is None when the line is not valid UTF-8, in which case
+    ``error`` says why.
+    """
+    for line_number, line in enumerate(uploaded_file, start=1):
+        try:
+            # A byte order mark can only start the first line
+            text = line.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+        except UnicodeDecodeError as e:
+            yield line_number, None, f'Invalid UTF-8 at byte {e.start + 1} of the line.'
+            continue
+        yield line_number, text, None
+
+
+def iter_upload_rows(uploaded_file, fmt):
+    """
+    Yield (line_number, row, error) for each record of an uploaded file
+    without reading it into memory. ``row`` is a dict, or None when the
+    line could not be decoded or parsed, in which case ``error`` says why.
+    """
+    lines = iter_upload_lines(uploaded_file)
+
+    if fmt == 'csv':
+        yield from _iter_csv_rows(lines)
+        return
+
+    for line_number, line, error in lines:
+        if error:
+            yield line_number, None, error
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, 'Each line must be a JSON object.'
+            continue
+        yield line_number, row, None
+
+
+def _iter_csv_rows(lines):
+    # Lines that can not be decoded are reported and left out of the CSV
+    skipped = []
+    position = {'line': 0}
+
+    def text_lines():
+        for line_number, line, error in lines:
+            if error:
+                skipped.append((line_number, None, error))
+                continue
+            position['line'] = line_number
+            yield line
+
+    reader = csv.DictReader(text_lines())
+    try:
+        reader.fieldnames
+    except csv.Error as e:
+        yield 1, None, f'Invalid CSV header: {e}'
+        return
+    if skipped and skipped[0][0] == 1:
+        yield 1, None, f'Invalid CSV header: {skipped[0][2]}'
+        return
+
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as e:
+            row, error = None, f'Invalid CSV: {e}'
+        else:
+            # Blank cells mean "not provided"
+            row, error = {key: value for key, value in row.items() if value not in ('', None)}, None
+        yield from skipped
+        skipped.clear()
+        yield position['line'], row, error
+    yield from skipped
+
+
+def chunked(iterable, size):
+    """Yield lists of up to ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_rows(rows, import_chunk, signal, sender, chunk_size=1000):
+    """
+    Import an iterable of (line_number, row, parse_error) in chunks.
+    ``import_chunk(chunk, report)`` creates the objects of one chunk,
+    recording failed rows with add_import_error(), and returns how many it
+    created; ``signal`` is sent with that count. Returns a report with the
+    number of created and failed rows and the errors of the failed rows.
+    """
+    report = {'created': 0, 'failed': 0, 'errors': []}
+
+    for chunk in chunked(rows, chunk_size):
+        created = import_chunk(chunk, report)
+        if created:
+            report['created'] += created
+            signal.send(sender=sender, count=created)
+
+    report['errors'].sort(key=lambda error: error['line'])
+    return report
+
+
+def add_import_error(report, line_number, errors):
+    """Count a failed row; the errors of the first MAX_REPORTED_ERRORS are kept."""
+    report['failed'] += 1
+    if len(report['errors']) < MAX_REPORTED_ERRORS:
+        report['errors'].append({'line': line_number, 'errors': errors})
+
+
+def validate_rows(chunk, serializer_class, report):
+    """Get (line_number, validated_data) for the rows of ``chunk`` that validate; report the others."""
+    valid_rows = []
+    for line_number, row, error in chunk:
+        if error:
+            add_import_error(report, line_number, {'non_field_errors': [error]})
+            continue
+
+        serializer = serializer_class(data=row)
+        if not serializer.is_valid():
+            add_import_error(report, line_number, serializer.errors)
+            continue
+        valid_rows.append((line_number, serializer.validated_data))
+    return valid_rows
+
@@ -19,9 +19,9 @@ from django.urls import include, path
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/', include('clients.urls')),
-    path('api/', include('debts.urls')),
-    path('api/', include('payments.urls')),
-    path('api/', include('notifications.urls')),
-
+    path('api/clients/', include('clients.urls')),
+    path('api/debts/', include('debts.urls')),
+    path('api/payments/', include('payments.urls')),
+    path('api/notifications/', include('notifications.urls')),
+    path('api/reports/', include('report.urls')),
 ]
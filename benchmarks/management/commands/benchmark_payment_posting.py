@@ -0,0 +1,174 @@
+import json
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from benchmarks.runner import _percentile
+from clients.models import Client, ClientBalanceSummary
+from debts.models import Debt
+from payments.models import Payment
+from payments.services import post_payment
+
+
+DEBT_AMOUNT = Decimal('100.00')
+
+
+def _post_with_service(debt_id, amount):
+    post_payment(debt_id, amount)
+
+
+def _post_with_model_save(debt_id, amount):
+    debt = Debt.objects.get(pk=debt_id)
+    Payment(client_id=debt.client_id, debt=debt, amount=amount).save()
+
+
+POSTERS = {
+    'service': _post_with_service,
+    'model': _post_with_model_save,
+}
+
+
+class Command(BaseCommand):
+    """Benchmark posting payments from concurrent threads."""
+
+    help = (
+        'Post payments against a few debts from concurrent threads on a throwaway test '
+        'database, with payments.services.post_payment() and with Payment.save(), and '
+        'report throughput, latency and whether any debt ended up overpaid.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent posters (default: 8).')
+        parser.add_argument('--payments', type=int, default=400, help='Payments attempted per mode (default: 400).')
+        parser.add_argument('--debts', type=int, default=10, help='Debts the payments are spread over (default: 10).')
+        parser.add_argument(
+            '--amount',
+            type=Decimal,
+            default=Decimal('7.00'),
+            help=f'Amount of each payment; debts are of {DEBT_AMOUNT} (default: 7.00).'
+        )
+        parser.add_argument(
+            '--modes',
+            default=','.join(POSTERS),
+            help=f'Comma-separated posting paths to compare (default: {",".join(POSTERS)}).'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42).')
+        parser.add_argument('--output', help='Also write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(POSTERS)
+        if unknown or not modes:
+            raise CommandError(f'--modes must be a comma-separated subset of {", ".join(POSTERS)}.')
+        if options['threads'] <= 0 or options['payments'] <= 0 or options['debts'] <= 0:
+            raise CommandError('--threads, --payments and --debts must be positive.')
+
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            # Threads need a database they can share: a file, not SQLite's in-memory default
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'payments.sqlite3')
+
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                for mode in modes:
+                    results[mode] = self.run_mode(mode, options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<8} {result['posted']:>5} posted {result['rejected']:>5} rejected "
+                f"{result['errors']:>4} errors  {result['payments_per_second']:>8.1f}/s  "
+                f"p50 {result['p50_ms']:>7.2f} ms  p95 {result['p95_ms']:>7.2f} ms  "
+                f"overpaid debts {result['overpaid_debts']}  summary drift {result['summary_drift']}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+                output.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+    def run_mode(self, mode, options):
+        """Post the payments of one mode against fresh debts; returns its measurements."""
+        client = Client.objects.create_user(
+            email=f'{mode}@bench.example.com', name=f'Posting {mode}', phone='555-0000'
+        )
+        debt_ids = [
+            Debt.objects.create(
+                client=client, amount=DEBT_AMOUNT, description='Benchmark', deadline=date(2099, 1, 1)
+            ).pk
+            for _ in range(options['debts'])
+        ]
+
+        rng = random.Random(options['seed'])
+        attempts = queue.Queue()
+        for _ in range(options['payments']):
+            attempts.put(rng.choice(debt_ids))
+
+        post = POSTERS[mode]
+        outcomes = {'posted': 0, 'rejected': 0, 'errors': 0}
+        timings = []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        debt_id = attempts.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        post(debt_id, options['amount'])
+                        outcome = 'posted'
+                    except ValidationError:
+                        outcome = 'rejected'
+                    except DatabaseError:
+                        outcome = 'errors'
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        outcomes[outcome] += 1
+                        timings.append(elapsed)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        money = DecimalField(max_digits=12, decimal_places=2)
+        paid = Round(Coalesce(Sum('payments__amount'), Value(Decimal('0.00')), output_field=money), 2)
+        debts = Debt.objects.filter(pk__in=debt_ids)
+
+        return {
+            **outcomes,
+            'threads': options['threads'],
+            'seconds': round(elapsed, 3),
+            'payments_per_second': round(outcomes['posted'] / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(_percentile(timings, 50), 2),
+            'p95_ms': round(_percentile(timings, 95), 2),
+            'p99_ms': round(_percentile(timings, 99), 2),
+            # Debts whose payments add up to more than they were worth
+            'overpaid_debts': debts.annotate(paid=paid).filter(paid__gt=F('amount')).count(),
+            'summary_drift': ClientBalanceSummary.reconcile(client_ids=[client.pk], dry_run=True),
+        }
@@ -0,0 +1,111 @@
+import json
+import platform
+import subprocess
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from benchmarks.runner import get_endpoints, run_benchmarks, table_counts
+from benchmarks.seed import seed
+from clients.models import Client
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Benchmark every API GET endpoint at several data sizes."""
+
+    help = (
+        'Seed a throwaway test database at each size, request every API GET endpoint '
+        'and write latency percentiles, query counts and peak memory to a JSON report.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='100,1000',
+            help='Comma-separated client counts to benchmark at (default: 100,1000).'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Timed requests per endpoint (default: 20).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the generated data.'
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark-report.json',
+            help='Where to write the JSON report.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options['sizes'].split(',')})
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers.')
+        if not sizes or sizes[0] <= 0:
+            raise CommandError('--sizes must be positive.')
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'runs': []
+        }
+
+        # Never touch the configured database: benchmark a fresh test database
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            user = Client.objects.create_superuser(
+                email='benchmark@example.com', name='Benchmark', phone='555-0000', password=None
+            )
+            seeded = 0
+            for size in sizes:
+                self.stdout.write(f'Seeding {size} clients...')
+                seed(clients=size - seeded, seed=options['seed'] + size)
+                seeded = size
+
+                endpoints = get_endpoints()
+                self.stdout.write(f'Benchmarking {len(endpoints)} endpoints at {size} clients...')
+                results = run_benchmarks(user, repeat=options['repeat'], endpoints=endpoints)
+                report['runs'].append({
+                    'clients': size,
+                    'rows': table_counts(),
+                    'endpoints': results
+                })
+
+                for url_name, result in results.items():
+                    self.stdout.write(
+                        f"  {url_name:<36} {result['status']} {result['queries']:>3}q "
+                        f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+                        f"peak {result['peak_memory_kb']:>9.1f} KiB"
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True, default=str)
+            output.write('\n')
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks.seed import EMAIL_DOMAIN, clear, seed
+
+
+class Command(BaseCommand):
+    """Fill the database with synthetic clients, debts, payments and notifications."""
+
+    help = 'Generate synthetic benchmark data with bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clients',
+            type=int,
+            default=1000,
+            help='Number of clients to create (each gets 0-8 debts with payments and notifications).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Random seed, for reproducible data.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of clients generated per transaction.'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help=f'Delete previously seeded clients (emails @{EMAIL_DOMAIN}) first.'
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = clear()
+            self.stdout.write(f'Deleted {deleted} previously seeded row(s).')
+
+        created = seed(
+            clients=options['clients'],
+            seed=options['seed'],
+            chunk_size=options['chunk_size']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            'Created ' + ', '.join(f'{count} {name}' for name, count in created.items()) + '.'
+        ))
@@ -0,0 +1,183 @@
+"""
+Endpoint benchmarks.
+
+Every GET route under the API is requested through the Django test client
+and timed. For each endpoint the report records latency percentiles over
+repeated requests, the number of SQL queries one request runs and the
+peak memory traced while serving it.
+"""
+import re
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+
+from django.db import connection
+from django.test import Client as TestClient
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from clients.models import Client
+from debts.models import Debt
+from notifications.models import Notification
+from payments.models import Payment
+from report.cache import get_report_cache
+
+
+API_PREFIX = 'api/'
+
+PERCENTILES = [50, 90, 95, 99]
+
+# Literals replaced when grouping statements that only differ in their values
+SQL_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def iter_routes(patterns=None, prefix='', namespace=None):
+    """Yield (route, url_name, view callback, kwarg names) for every named URL."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            child_namespace = namespace
+            if pattern.namespace:
+                child_namespace = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+            yield from iter_routes(pattern.url_patterns, route, child_namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            url_name = f'{namespace}:{pattern.name}' if namespace else pattern.name
+            yield route, url_name, pattern.callback, list(pattern.pattern.regex.groupindex)
+
+
+def _handles_get(callback):
+    actions = getattr(callback, 'actions', None)
+    if actions is not None:
+        return 'get' in actions
+    view_class = getattr(callback, 'view_class', None) or getattr(callback, 'cls', None)
+    return view_class is not None and hasattr(view_class, 'get')
+
+
+def get_endpoints():
+    """
+    Get the sorted (url_name, path) of every GET endpoint under the API.
+    Detail routes are filled in with the pk of an existing row; routes
+    whose model has no rows are skipped.
+    """
+    endpoints = {}
+    for route, url_name, callback, kwargs in iter_routes():
+        if not route.startswith(API_PREFIX) or 'format' in kwargs or not _handles_get(callback):
+            continue
+        if url_name in endpoints:
+            continue
+
+        values = {}
+        if kwargs:
+            if kwargs != ['pk']:
+                continue
+            model = callback.cls.queryset.model
+            rows = model.objects.order_by('pk').values_list('pk', flat=True)
+            pk = rows[rows.count() // 2] if rows.exists() else None
+            if pk is None:
+                continue
+            values['pk'] = pk
+
+        endpoints[url_name] = reverse(url_name, kwargs=values)
+
+    # Drop router API roots that share their path with a list route
+    paths = [path for url_name, path in endpoints.items() if not url_name.endswith('api-root')]
+    return sorted(
+        (url_name, path) for url_name, path in endpoints.items()
+        if not (url_name.endswith('api-root') and path in paths)
+    )
+
+
+def _percentile(timings, percent):
+    ordered = sorted(timings)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _request(client, path):
+    response = client.get(path)
+    if response.streaming:
+        # Exports are only done once their last row has been written out
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def capture_queries(client, path):
+    """Request ``path`` with the report cache empty; returns the response and the SQL it ran."""
+    get_report_cache().clear()
+    # The query log is capped; start from an empty one so nothing is dropped
+    connection.queries_log.clear()
+
+    with CaptureQueriesContext(connection) as context:
+        response = _request(client, path)
+    return response, [query['sql'] for query in context.captured_queries]
+
+
+def repeated_queries(queries, limit=5):
+    """
+    Get up to ``limit`` (count, statement) pairs for the statements in
+    ``queries`` that ran more than once, with the same or different
+    literal values, most repeated first.
+    """
+    counts = Counter(SQL_LITERAL.sub('?', sql) for sql in queries)
+    return [(count, sql) for sql, count in counts.most_common(limit) if count > 1]
+
+
+def benchmark_endpoint(client, path, repeat=20):
+    """Measure one endpoint; returns its status, query count, memory and timings."""
+    # Report responses are cached; measure the first, uncached request separately
+    started = time.perf_counter()
+    response, queries = capture_queries(client, path)
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    get_report_cache().clear()
+    tracemalloc.start()
+    try:
+        _request(client, path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _request(client, path)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return {
+        'path': path,
+        'status': response.status_code,
+        'queries': len(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'cold_ms': round(cold_ms, 2),
+        'mean_ms': round(statistics.mean(timings), 2),
+        **{f'p{percent}_ms': round(_percentile(timings, percent), 2) for percent in PERCENTILES}
+    }
+
+
+def run_benchmarks(user, repeat=20, endpoints=None):
+    """Benchmark every GET endpoint as ``user``; returns results keyed by URL name."""
+    client = TestClient()
+    client.force_login(user)
+
+    results = {}
+    # Clearing the report cache also drops the overdue sweep's lock when both
+    # use the default cache, which would make every measured request sweep
+    with override_settings(OVERDUE_SWEEP_INTERVAL=0):
+        for url_name, path in endpoints or get_endpoints():
+            results[url_name] = benchmark_endpoint(client, path, repeat)
+    return results
+
+
+def table_counts():
+    """Row counts of the main tables, to label a benchmark run."""
+    return {
+        'clients': Client.objects.count(),
+        'debts': Debt.objects.count(),
+        'payments': Payment.objects.count(),
+        'notifications': Notification.objects.count(),
+    }
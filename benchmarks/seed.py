@@ -0,0 +1,158 @@
+"""
+Synthetic data for benchmarks.
+
+Clients, debts, payments and notifications are generated in chunks with
+bulk_create. Debt balances and statuses are computed while generating, and
+the balance summaries and daily payment rollups are rebuilt at the end, so
+the seeded data looks exactly like data written through the models.
+"""
+import math
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from clients.models import Client, ClientBalanceSummary
+from debts.models import Debt
+from notifications.models import Notification
+from payments.models import Payment, PaymentDailyRollup
+
+
+EMAIL_DOMAIN = 'bench.example.com'
+
+CENT = Decimal('0.01')
+
+
+def _money(value):
+    return Decimal(value).quantize(CENT)
+
+
+def _debt_amount(rng):
+    """Log-normal face amounts: mostly a few hundred, with a long tail."""
+    return _money(min(max(math.exp(rng.gauss(6.0, 1.1)), 10), 250000))
+
+
+def _payments_for(rng, debt, today):
+    """Pay about a third of the debts in full, a third in part and leave the rest unpaid."""
+    outcome = rng.random()
+    if outcome < 0.35:
+        paid = debt.amount
+    elif outcome < 0.7:
+        paid = _money(debt.amount * Decimal(rng.uniform(0.05, 0.95)))
+    else:
+        return []
+
+    installments = rng.choices([1, 2, 3, 4, 6], weights=[40, 25, 15, 12, 8])[0]
+    amounts = []
+    left = paid
+    for index in range(installments):
+        amount = left if index == installments - 1 else _money(paid / installments)
+        if amount > 0:
+            amounts.append(amount)
+        left -= amount
+
+    return [
+        Payment(
+            client_id=debt.client_id,
+            debt=debt,
+            amount=amount,
+            date=today - timezone.timedelta(days=rng.randint(0, 365)),
+            reference_number=f'BENCH-{rng.getrandbits(40):x}'
+        )
+        for amount in amounts
+    ]
+
+
+def _notifications_for(rng, debt, email, now):
+    notifications = []
+    for _ in range(rng.choices([0, 1, 2], weights=[50, 35, 15])[0]):
+        status = rng.choices(['PENDING', 'SENT', 'FAILED'], weights=[20, 75, 5])[0]
+        scheduled_for = now + timezone.timedelta(hours=rng.randint(-24 * 120, 24 * 30))
+        notifications.append(Notification(
+            client_id=debt.client_id,
+            debt=debt,
+            recipient_email=email,
+            subject='Payment reminder',
+            message=f'Your debt of ${debt.amount} is due on {debt.deadline}.',
+            scheduled_for=scheduled_for,
+            sent_at=scheduled_for if status == 'SENT' else None,
+            status=status,
+            error_message='Connection refused' if status == 'FAILED' else None
+        ))
+    return notifications
+
+
+def seed(clients=1000, seed=None, chunk_size=500):
+    """
+    Create ``clients`` synthetic clients with debts, payments and
+    notifications. Returns the number of rows created per model.
+    """
+    rng = random.Random(seed)
+    today = timezone.now().date()
+    now = timezone.now()
+    password = make_password(None)
+    start = Client.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').count()
+    created = {'clients': 0, 'debts': 0, 'payments': 0, 'notifications': 0}
+
+    for offset in range(0, clients, chunk_size):
+        count = min(chunk_size, clients - offset)
+        with transaction.atomic():
+            new_clients = Client.objects.bulk_create([
+                Client(
+                    email=f'client{start + offset + i}@{EMAIL_DOMAIN}',
+                    name=f'Benchmark Client {start + offset + i}',
+                    phone=f'555-{rng.randint(0, 9999):04d}',
+                    password=password,
+                    created_at=now - timezone.timedelta(days=rng.randint(0, 730))
+                )
+                for i in range(count)
+            ])
+
+            debts = []
+            for client in new_clients:
+                for _ in range(rng.choices([0, 1, 2, 3, 5, 8], weights=[10, 30, 25, 15, 12, 8])[0]):
+                    debts.append(Debt(
+                        client_id=client.pk,
+                        amount=_debt_amount(rng),
+                        description=rng.choice(['Loan', 'Invoice', 'Credit purchase', 'Service fee']),
+                        deadline=today + timezone.timedelta(days=rng.randint(-200, 120))
+                    ))
+
+            payments = []
+            notifications = []
+            emails = {client.pk: client.email for client in new_clients}
+            for debt in debts:
+                debt_payments = _payments_for(rng, debt, today)
+                payments.extend(debt_payments)
+                notifications.extend(_notifications_for(rng, debt, emails[debt.client_id], now))
+
+                debt.amount_paid = sum((payment.amount for payment in debt_payments), Decimal('0.00'))
+                debt.remaining_balance = debt.amount - debt.amount_paid
+                if debt.remaining_balance <= 0:
+                    debt.status = 'PAID'
+                elif debt.deadline < today:
+                    debt.status = 'OVERDUE'
+
+            # Payments and notifications pick up the debt ids assigned here
+            Debt.objects.bulk_create(debts, batch_size=1000)
+            Payment.objects.bulk_create(payments, batch_size=1000)
+            Notification.objects.bulk_create(notifications, batch_size=1000)
+            ClientBalanceSummary.reconcile(client_ids=[client.pk for client in new_clients])
+
+        created['clients'] += len(new_clients)
+        created['debts'] += len(debts)
+        created['payments'] += len(payments)
+        created['notifications'] += len(notifications)
+
+    PaymentDailyRollup.rebuild()
+    return created
+
+
+def clear():
+    """Delete every synthetic client (and, by cascade, their data)."""
+    with transaction.atomic():
+        deleted, _ = Client.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+        PaymentDailyRollup.rebuild()
+    return deleted
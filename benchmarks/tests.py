@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from clients.models import Client
+from .runner import capture_queries, get_endpoints, repeated_queries, run_benchmarks
+from .seed import seed
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0, SLOW_REQUEST_THRESHOLD_MS=None, PROFILE_SAMPLE_RATE=0)
+class QueryCountScalingTests(TestCase):
+    """Every GET endpoint under the API must run as many queries at both data sizes."""
+
+    small = 10
+    large = 200
+
+    def setUp(self):
+        self.user = Client.objects.create_superuser(
+            email='staff@example.com', name='Staff', phone='555-0100', password=None
+        )
+        self.client.force_login(self.user)
+
+    def measure(self):
+        """Get {url_name: (path, queries)} for every endpoint."""
+        measured = {}
+        for url_name, path in get_endpoints():
+            response, queries = capture_queries(self.client, path)
+            self.assertLess(response.status_code, 400, f'{url_name} ({path}) returned {response.status_code}')
+            measured[url_name] = (path, queries)
+        return measured
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        seed(clients=self.small, seed=1)
+        small = self.measure()
+        seed(clients=self.large - self.small, seed=2)
+        large = self.measure()
+
+        self.assertEqual(set(small), set(large))
+        self.assertIn('report:dashboard', large)
+        self.assertIn('debt:debt-detail', large)
+
+        failures = []
+        for url_name, (path, queries) in sorted(large.items()):
+            expected = len(small[url_name][1])
+            if len(queries) > expected:
+                failures.append(
+                    f'{url_name} ({path}): {expected} queries with {self.small} clients, '
+                    f'{len(queries)} with {self.large}'
+                )
+                failures += [f'    {count}x {sql}' for count, sql in repeated_queries(queries)]
+        if failures:
+            self.fail('Query counts grow with the number of rows:\n' + '\n'.join(failures))
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=60, SLOW_REQUEST_THRESHOLD_MS=None, PROFILE_SAMPLE_RATE=0)
+class RunBenchmarksTests(TestCase):
+    """The benchmark measures the endpoints, not the request-driven sweep."""
+
+    def test_benchmarked_requests_do_not_sweep(self):
+        user = Client.objects.create_superuser(
+            email='staff@example.com', name='Staff', phone='555-0100', password=None
+        )
+
+        with mock.patch('debts.middleware.sweep_overdue_debts') as sweep:
+            results = run_benchmarks(user, repeat=2, endpoints=[('report:dashboard', '/api/reports/dashboard/')])
+
+        sweep.assert_not_called()
+        self.assertEqual(results['report:dashboard']['status'], 200)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from clients.models import ClientBalanceSummary
+
+
+class Command(BaseCommand):
+    """Repair drift in the ClientBalanceSummary table."""
+
+    help = 'Recompute client balance summaries from debts and payments and fix drifted rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count missing or drifted summaries without writing them.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of clients to reconcile per batch.'
+        )
+
+    def handle(self, *args, **options):
+        drifted = ClientBalanceSummary.reconcile(
+            dry_run=options['dry_run'],
+            chunk_size=options['chunk_size']
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f'{drifted} client summary row(s) are missing or out of date.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {drifted} client summary row(s).'))
@@ -0,0 +1,92 @@
+# Generated by Django 6.0 on 2026-10-17 23:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def fill_emails(apps, schema_editor):
+    # Existing clients predate logging in by email; give each a unique placeholder
+    Client = apps.get_model('clients', 'Client')
+    for client in Client.objects.filter(email__isnull=True).only('pk'):
+        client.email = f'client-{client.pk}@example.invalid'
+        client.save(update_fields=['email'])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('clients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='client',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Client', 'verbose_name_plural': 'Clients'},
+        ),
+        migrations.AlterModelTable(
+            name='client',
+            table='clients',
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='email',
+            field=models.EmailField(max_length=255, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_emails, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='client',
+            name='email',
+            field=models.EmailField(max_length=255, unique=True),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='password',
+            field=models.CharField(default='', max_length=128, verbose_name='password'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='last_login',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='last login'),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='is_staff',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='is_superuser',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='groups',
+            field=models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups'),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='user_permissions',
+            field=models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions'),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='address',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='name',
+            field=models.CharField(max_length=200),
+        ),
+    ]
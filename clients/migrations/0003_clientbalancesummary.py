@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-17 10:03
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_sync_with_models'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientBalanceSummary',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='balance_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_debt', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('active_debts_count', models.IntegerField(default=0)),
+                ('overdue_debts_count', models.IntegerField(default=0)),
+                ('last_payment_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Client Balance Summary',
+                'verbose_name_plural': 'Client Balance Summaries',
+                'db_table': 'client_balance_summaries',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-17 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0004_client_clients_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['updated_at'], name='clients_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientbalancesummary',
+            index=models.Index(fields=['updated_at'], name='summaries_updated_idx'),
+        ),
+    ]
@@ -1,9 +1,50 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value, OuterRef, Subquery, Sum, Count, Max, DecimalField, ExpressionWrapper
+from django.db.models.functions import Coalesce, Greatest, Round
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
+from decimal import Decimal
 
 
-class ClientManager(BaseUserManager):
+class ClientQuerySet(models.QuerySet):
+    """QuerySet for Client model."""
+    
+    def with_balances(self):
+        """
+        Annotate clients with total_debt, total_paid, balance,
+        active_debts_count, overdue_debts_count and last_payment_date,
+        computed in SQL from the debts and payments tables.
+        """
+        from debts.models import Debt
+        from payments.models import Payment
+        
+        money = DecimalField(max_digits=12, decimal_places=2)
+        zero = Value(Decimal('0.00'))
+        debts = Debt.objects.filter(client=OuterRef('pk')).order_by().values('client')
+        payments = Payment.objects.filter(client=OuterRef('pk')).order_by().values('client')
+        
+        return self.annotate(
+            total_debt=Round(Coalesce(
+                Subquery(debts.annotate(total=Sum('amount')).values('total')), zero, output_field=money
+            ), 2),
+            total_paid=Round(Coalesce(
+                Subquery(payments.annotate(total=Sum('amount')).values('total')), zero, output_field=money
+            ), 2),
+            active_debts_count=Coalesce(
+                Subquery(debts.filter(status='PENDING').annotate(n=Count('id')).values('n')), 0
+            ),
+            overdue_debts_count=Coalesce(
+                Subquery(debts.filter(status='OVERDUE').annotate(n=Count('id')).values('n')), 0
+            ),
+            last_payment_date=Subquery(payments.annotate(last=Max('date')).values('last')),
+        ).annotate(
+            # Rounded, since SQLite sums decimals as floats
+            balance=Round(ExpressionWrapper(F('total_debt') - F('total_paid'), output_field=money), 2)
+        )
+
+
+class ClientManager(BaseUserManager.from_queryset(ClientQuerySet)):
     """Custom manager for Client model."""
     
     def create_user(self, email, name, phone, password=None, **extra_fields):
@@ -45,6 +86,7 @@ class Client(AbstractBaseUser, PermissionsMixin):
     phone = models.CharField(max_length=20)
     address = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
     
     # Required fields for custom user model
     is_active = models.BooleanField(default=True)
@@ -59,24 +101,184 @@ class Client(AbstractBaseUser, PermissionsMixin):
     class Meta:
         db_table = 'clients'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination over Meta.ordering + id
+            models.Index(fields=['-created_at', '-id'], name='clients_created_id_idx'),
+            # Latest change, for the ETag validators
+            models.Index(fields=['updated_at'], name='clients_updated_idx'),
+        ]
         verbose_name = 'Client'
         verbose_name_plural = 'Clients'
     
     def __str__(self):
         return f"{self.name} ({self.email})"
     
+    def save(self, *args, **kwargs):
+        """Override save to create the balance summary row for new clients."""
+        is_new = self.pk is None
+        super().save(*args, **kwargs)
+        
+        if is_new:
+            ClientBalanceSummary.objects.get_or_create(client=self)
+    
+    def delete(self, *args, **kwargs):
+        """Override delete to drop the client's cascade-deleted payments from the daily rollups."""
+        from payments.models import Payment, PaymentDailyRollup
+        
+        with transaction.atomic():
+            payment_dates = list(
+                Payment.objects.filter(client=self).order_by().values_list('date', flat=True).distinct()
+            )
+            result = super().delete(*args, **kwargs)
+            if payment_dates:
+                PaymentDailyRollup.rebuild(dates=payment_dates)
+        return result
+    
+    def get_balance_summary(self):
+        """Get the balance summary row, rebuilding it if it is missing."""
+        try:
+            return self.balance_summary
+        except ClientBalanceSummary.DoesNotExist:
+            ClientBalanceSummary.reconcile(client_ids=[self.pk])
+            return ClientBalanceSummary.objects.get(client_id=self.pk)
+    
     def get_total_debt(self):
-        """Calculate total debt amount for this client."""
-        return sum(debt.amount for debt in self.debts.all())
+        """Get total debt amount for this client."""
+        if hasattr(self, 'total_debt'):
+            return self.total_debt
+        return self.get_balance_summary().total_debt
     
     def get_total_paid(self):
-        """Calculate total amount paid by this client."""
-        return sum(payment.amount for payment in self.payments.all())
+        """Get total amount paid by this client."""
+        if hasattr(self, 'total_paid'):
+            return self.total_paid
+        return self.get_balance_summary().total_paid
     
     def get_balance(self):
-        """Calculate remaining balance (total debt - total paid)."""
-        return self.get_total_debt() - self.get_total_paid()
+        """Get remaining balance (total debt - total paid)."""
+        if hasattr(self, 'balance'):
+            return self.balance
+        return self.get_balance_summary().balance
     
     def has_overdue_debts(self):
         """Check if client has any overdue debts."""
-        return self.debts.filter(status='OVERDUE').exists()
+        if hasattr(self, 'overdue_debts_count'):
+            return self.overdue_debts_count > 0
+        return self.get_balance_summary().overdue_debts_count > 0
+
+
+class ClientBalanceSummary(models.Model):
+    """
+    Per-client balance totals.
+    Maintained incrementally by Debt and Payment writes and repaired
+    with the reconcile_client_balances command.
+    """
+    client = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='balance_summary'
+    )
+    total_debt = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    active_debts_count = models.IntegerField(default=0)
+    overdue_debts_count = models.IntegerField(default=0)
+    last_payment_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    SUMMARY_FIELDS = [
+        'total_debt', 'total_paid', 'balance',
+        'active_debts_count', 'overdue_debts_count', 'last_payment_date'
+    ]
+    
+    class Meta:
+        db_table = 'client_balance_summaries'
+        indexes = [
+            # Latest change, for the ETag validators
+            models.Index(fields=['updated_at'], name='summaries_updated_idx'),
+        ]
+        verbose_name = 'Client Balance Summary'
+        verbose_name_plural = 'Client Balance Summaries'
+    
+    def __str__(self):
+        return f"Balance summary for client {self.client_id}: ${self.balance}"
+    
+    @classmethod
+    def apply_delta(cls, client_id, debt=0, paid=0, active=0, overdue=0,
+                    payment_date=None, refresh_last_payment=False):
+        """Apply incremental changes to a client's summary with a single UPDATE."""
+        updates = {}
+        
+        if debt:
+            updates['total_debt'] = F('total_debt') + debt
+        if paid:
+            updates['total_paid'] = F('total_paid') + paid
+        if debt or paid:
+            updates['balance'] = F('balance') + debt - paid
+        if active:
+            updates['active_debts_count'] = F('active_debts_count') + active
+        if overdue:
+            updates['overdue_debts_count'] = F('overdue_debts_count') + overdue
+        
+        if refresh_last_payment:
+            from payments.models import Payment
+            updates['last_payment_date'] = Subquery(
+                Payment.objects.filter(client_id=client_id).order_by('-date').values('date')[:1]
+            )
+        elif payment_date:
+            updates['last_payment_date'] = Greatest(
+                Coalesce(F('last_payment_date'), Value(payment_date)),
+                Value(payment_date)
+            )
+        
+        if not updates:
+            return
+        
+        updates['updated_at'] = timezone.now()
+        if not cls.objects.filter(client_id=client_id).update(**updates):
+            # No summary row yet: build it from the (already written) source rows
+            cls.reconcile(client_ids=[client_id])
+    
+    @classmethod
+    def reconcile(cls, client_ids=None, dry_run=False, chunk_size=2000):
+        """
+        Recompute summaries from debts and payments and repair drifted rows.
+        Returns the number of rows that were missing or out of date.
+        """
+        clients = Client.objects.all()
+        if client_ids is not None:
+            clients = clients.filter(pk__in=client_ids)
+        
+        client_pks = clients.order_by('pk').values_list('pk', flat=True)
+        
+        drift_count = 0
+        last_pk = None
+        while True:
+            chunk = client_pks if last_pk is None else client_pks.filter(pk__gt=last_pk)
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1]
+            
+            stored = {
+                summary['client_id']: summary
+                for summary in cls.objects.filter(client_id__in=chunk).values('client_id', *cls.SUMMARY_FIELDS)
+            }
+            drifted = []
+            for actual in Client.objects.filter(pk__in=chunk).with_balances().values('pk', *cls.SUMMARY_FIELDS):
+                client_id = actual.pop('pk')
+                current = stored.get(client_id)
+                if current is None or any(current[field] != value for field, value in actual.items()):
+                    drifted.append(cls(client_id=client_id, updated_at=timezone.now(), **actual))
+            
+            drift_count += len(drifted)
+            if drifted and not dry_run:
+                cls.objects.bulk_create(
+                    drifted,
+                    update_conflicts=True,
+                    unique_fields=['client'],
+                    update_fields=cls.SUMMARY_FIELDS + ['updated_at']
+                )
+        
+        return drift_count
@@ -1,8 +1,10 @@
 from rest_framework import serializers
+from Client_Debt_Control_System.fieldsets import SparseFieldsetSerializerMixin
+from Client_Debt_Control_System.instrumentation import TimedSerializerMixin
 from .models import Client
 
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(SparseFieldsetSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Client model."""
     
     total_debt = serializers.SerializerMethodField()
@@ -59,7 +61,7 @@ class ClientSerializer(serializers.ModelSerializer):
         return instance
 
 
-class ClientBalanceSerializer(serializers.ModelSerializer):
+class ClientBalanceSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Detailed balance information for a client."""
     
     total_debt = serializers.SerializerMethodField()
@@ -86,7 +88,11 @@ class ClientBalanceSerializer(serializers.ModelSerializer):
         return float(obj.get_balance())
     
     def get_active_debts_count(self, obj):
-        return obj.debts.filter(status='PENDING').count()
+        if hasattr(obj, 'active_debts_count'):
+            return obj.active_debts_count
+        return obj.get_balance_summary().active_debts_count
     
     def get_overdue_debts_count(self, obj):
-        return obj.debts.filter(status='OVERDUE').count()
+        if hasattr(obj, 'overdue_debts_count'):
+            return obj.overdue_debts_count
+        return obj.get_balance_summary().overdue_debts_count
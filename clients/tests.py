@@ -1,3 +1,282 @@
-from django.test import TestCase
+import tempfile
+from decimal import Decimal
+from datetime import timedelta
+from pathlib import Path
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from debts.models import Debt
+from payments.models import Payment
+from .models import Client, ClientBalanceSummary
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class ClientBalanceSummaryTests(TestCase):
+    """The balance summary follows debt and payment writes and can be reconciled."""
+
+    def setUp(self):
+        self.first = Client.objects.create_user(
+            email='first@example.com', name='First', phone='555-0101'
+        )
+        self.second = Client.objects.create_user(
+            email='second@example.com', name='Second', phone='555-0102'
+        )
+        self.today = timezone.now().date()
+
+    def summary(self, client):
+        summary = ClientBalanceSummary.objects.get(client=client)
+        return (
+            summary.total_debt, summary.total_paid, summary.balance,
+            summary.active_debts_count, summary.overdue_debts_count
+        )
+
+    def assertInSync(self):
+        self.assertEqual(ClientBalanceSummary.reconcile(dry_run=True), 0)
+
+    def test_debt_edits_and_payments_update_the_summary(self):
+        debt = Debt.objects.create(
+            client=self.first, amount=Decimal('100.00'), description='Loan',
+            deadline=self.today + timedelta(days=10)
+        )
+        Payment(client=self.first, debt=debt, amount=Decimal('30.00')).save()
+        self.assertEqual(self.summary(self.first), (Decimal('100.00'), Decimal('30.00'), Decimal('70.00'), 1, 0))
+
+        debt.refresh_from_db()
+        debt.amount = Decimal('120.00')
+        debt.deadline = self.today - timedelta(days=1)
+        debt.save()
+        self.assertEqual(self.summary(self.first), (Decimal('120.00'), Decimal('30.00'), Decimal('90.00'), 0, 1))
+        self.assertInSync()
+
+        Payment(client=self.first, debt=debt, amount=Decimal('90.00'), date=self.today - timedelta(days=3)).save()
+        self.assertEqual(self.summary(self.first), (Decimal('120.00'), Decimal('120.00'), Decimal('0.00'), 0, 0))
+        self.assertEqual(ClientBalanceSummary.objects.get(client=self.first).last_payment_date, self.today)
+        self.assertInSync()
+
+        Debt.objects.get(pk=debt.pk).delete()
+        self.assertEqual(self.summary(self.first), (Decimal('0.00'), Decimal('0.00'), Decimal('0.00'), 0, 0))
+        self.assertIsNone(ClientBalanceSummary.objects.get(client=self.first).last_payment_date)
+        self.assertInSync()
+
+    def test_reassigning_a_debt_moves_it_between_summaries(self):
+        debt = Debt.objects.create(
+            client=self.first, amount=Decimal('50.00'), description='Loan',
+            deadline=self.today + timedelta(days=10)
+        )
+
+        debt.client = self.second
+        debt.save()
+
+        self.assertEqual(self.summary(self.first), (Decimal('0.00'), Decimal('0.00'), Decimal('0.00'), 0, 0))
+        self.assertEqual(self.summary(self.second), (Decimal('50.00'), Decimal('0.00'), Decimal('50.00'), 1, 0))
+        self.assertInSync()
+
+    def test_reconcile_repairs_drifted_and_missing_rows(self):
+        Debt.objects.create(
+            client=self.first, amount=Decimal('50.00'), description='Loan',
+            deadline=self.today + timedelta(days=10)
+        )
+        ClientBalanceSummary.objects.filter(client=self.first).update(total_debt=Decimal('1.00'), active_debts_count=7)
+        ClientBalanceSummary.objects.filter(client=self.second).delete()
+
+        self.assertEqual(ClientBalanceSummary.reconcile(dry_run=True), 2)
+        self.assertEqual(ClientBalanceSummary.objects.get(client=self.first).active_debts_count, 7)
+
+        self.assertEqual(ClientBalanceSummary.reconcile(chunk_size=1), 2)
+        self.assertEqual(self.summary(self.first), (Decimal('50.00'), Decimal('0.00'), Decimal('50.00'), 1, 0))
+        self.assertEqual(self.summary(self.second), (Decimal('0.00'), Decimal('0.00'), Decimal('0.00'), 0, 0))
+        self.assertInSync()
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class ClientListQueryCountTests(APITestCase):
+    """Regression tests for the annotated ClientViewSet queryset."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date()
+
+    def create_clients(self, count, start=0):
+        """Create clients that each have one pending and one overdue debt with a payment."""
+        for i in range(start, start + count):
+            client = Client.objects.create_user(
+                email=f'client{i}@example.com', name=f'Client {i}', phone='555-0101'
+            )
+            pending = Debt.objects.create(
+                client=client, amount=Decimal('100.00'), description='Pending',
+                deadline=self.today + timedelta(days=10)
+            )
+            Debt.objects.create(
+                client=client, amount=Decimal('50.00'), description='Overdue',
+                deadline=self.today - timedelta(days=10)
+            )
+            Payment(client=client, debt=pending, amount=Decimal('30.00')).save()
+
+    def test_list_query_count_does_not_grow_with_clients(self):
+        url = reverse('client:client-list')
+
+        # The ETag fingerprint (clients, then balance summaries) and the page
+        self.create_clients(3)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 4)
+
+        self.create_clients(20, start=3)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 24)
+
+    def test_list_returns_annotated_balances(self):
+        self.create_clients(1)
+
+        response = self.client.get(reverse('client:client-list'))
+
+        data = next(row for row in response.data['results'] if row['email'] == 'client0@example.com')
+        self.assertEqual(data['total_debt'], 150.0)
+        self.assertEqual(data['total_paid'], 30.0)
+        self.assertEqual(data['balance'], 120.0)
+        self.assertTrue(data['has_overdue_debts'])
+
+    def test_balance_action_uses_annotated_counts(self):
+        self.create_clients(1)
+        client = Client.objects.get(email='client0@example.com')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('client:client-balance', args=[client.pk]))
+
+        self.assertEqual(response.data['active_debts_count'], 1)
+        self.assertEqual(response.data['overdue_debts_count'], 1)
+
+    def test_list_answers_matching_etag_with_304(self):
+        url = reverse('client:client-list')
+        self.create_clients(1)
+        etag = self.client.get(url)['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        # A payment changes the listed balances
+        debt = Debt.objects.filter(status='PENDING').first()
+        Payment(client=debt.client, debt=debt, amount=Decimal('1.00')).save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class RequestTimingMiddlewareTests(APITestCase):
+    """Tests for the Server-Timing header and the slow request log."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=None)
+    def test_server_timing_reports_queries_and_timings(self):
+        response = self.client.get(reverse('client:client-list'))
+
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="3 queries"', timing)
+        self.assertIn('serializer;dur=', timing)
+        self.assertIn('view;dur=', timing)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_requests_are_logged_with_their_queries(self):
+        with self.assertLogs('Client_Debt_Control_System.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('client:client-list'))
+
+        entry = logs.records[0].slow_request
+        self.assertEqual(entry['path'], reverse('client:client-list'))
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['queries'], 3)
+        self.assertEqual(entry['repeated_queries'], [])
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0, PROFILE_SAMPLE_RATE=0)
+class ProfilingMiddlewareTests(APITestCase):
+    """Tests for the opt-in request profiler."""
+
+    def setUp(self):
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.profile_dir.cleanup)
+        self.staff = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', is_staff=True
+        )
+        self.user = Client.objects.create_user(
+            email='user@example.com', name='User', phone='555-0101'
+        )
+
+    def test_staff_can_request_a_profile(self):
+        self.client.force_login(self.staff)
+
+        with override_settings(PROFILE_DIR=self.profile_dir.name):
+            response = self.client.get(reverse('client:client-list'), {'profile': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Profile-Id']
+        self.assertTrue((Path(self.profile_dir.name) / f'{name}.pstats').exists())
+        summary = (Path(self.profile_dir.name) / f'{name}.txt').read_text()
+        self.assertIn('[clients]', summary)
+
+    def test_other_users_are_not_profiled(self):
+        self.client.force_login(self.user)
+
+        with override_settings(PROFILE_DIR=self.profile_dir.name):
+            response = self.client.get(reverse('client:client-list'), HTTP_X_PROFILE='1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(list(Path(self.profile_dir.name).iterdir()), [])
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class ClientSparseFieldsetTests(APITestCase):
+    """Tests for ?fields= / ?exclude= on the client list."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        debt = Debt.objects.create(
+            client=self.user, amount=Decimal('100.00'), description='Debt',
+            deadline=timezone.now().date() + timedelta(days=10)
+        )
+        Payment(client=self.user, debt=debt, amount=Decimal('40.00')).save()
+
+    def test_lookup_fields_skip_the_balance_aggregates(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('client:client-list'), {'fields': 'id,name'})
+
+        self.assertEqual(response.data['results'], [{'id': self.user.pk, 'name': 'Staff'}])
+        page_query = context.captured_queries[-1]['sql']
+        self.assertNotIn('"payments"', page_query)
+        self.assertNotIn('"clients"."address"', page_query)
+
+    def test_exclude_keeps_the_other_fields(self):
+        response = self.client.get(reverse('client:client-list'), {'exclude': 'has_overdue_debts,address'})
+
+        row = response.data['results'][0]
+        self.assertNotIn('has_overdue_debts', row)
+        self.assertNotIn('address', row)
+        self.assertEqual(row['balance'], 60.0)
+        self.assertEqual(row['email'], 'staff@example.com')
+
+    def test_writes_ignore_sparse_fieldsets(self):
+        response = self.client.patch(
+            reverse('client:client-detail', args=[self.user.pk]) + '?fields=id', {'name': 'Renamed'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'Renamed')
@@ -4,8 +4,10 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from Client_Debt_Control_System.conditional import ConditionalGetMixin
+from Client_Debt_Control_System.fieldsets import SparseFieldsetMixin
 from django.contrib.auth import authenticate, login, logout
-from .models import Client
+from .models import Client, ClientBalanceSummary
 from .serializers import ClientSerializer, ClientBalanceSerializer
 
 
@@ -38,7 +40,7 @@ def client_detail_view(request, pk):
 
 
 # API ViewSet
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(SparseFieldsetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Client model.
     Provides CRUD operations and custom actions.
@@ -46,6 +48,17 @@ class ClientViewSet(viewsets.ModelViewSet):
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
     permission_classes = [IsAuthenticated]
+    # Balances shown in the list change with the client's balance summary
+    conditional_related_models = [ClientBalanceSummary]
+    replica_actions = ['list', 'retrieve', 'balance', 'me']
+    
+    def get_queryset(self):
+        """Annotate balances and debt counts so serializing a client costs no extra queries."""
+        queryset = Client.objects.all()
+        # Skip the aggregates when a sparse fieldset leaves every balance field out
+        if self.wants_fields('total_debt', 'total_paid', 'balance', 'has_overdue_debts'):
+            queryset = queryset.with_balances()
+        return self.sparse_queryset(queryset)
     
     def get_permissions(self):
         """Allow registration and login without authentication."""
@@ -26,6 +26,12 @@ class DebtAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at', 'updated_at']
     
+    def get_actions(self, request):
+        # Bulk deletes skip Debt.delete(), which updates the client summary
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+    
     def get_remaining_balance(self, obj):
         """Display remaining balance in admin."""
         return f"${obj.get_remaining_balance():.2f}"
@@ -0,0 +1,90 @@
+"""
+Batch debt creation.
+
+Rows are validated and inserted in chunks: each chunk resolves its clients
+(by id or email) with one query, applies the PENDING/OVERDUE rule from
+Debt.save() to every row, inserts the debts with bulk_create and applies
+one balance summary delta per client.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from Client_Debt_Control_System.uploads import add_import_error, import_rows, validate_rows
+from clients.models import Client, ClientBalanceSummary
+from .models import Debt
+from .serializers import DebtImportRowSerializer
+from .signals import debts_imported
+
+
+def import_debts(rows, chunk_size=1000):
+    """
+    Create debts from an iterable of (line_number, row, parse_error).
+    Each chunk is committed on its own. Returns the import report (see
+    import_rows).
+    """
+    return import_rows(rows, _import_chunk, debts_imported, Debt, chunk_size)
+
+
+def _resolve_clients(references):
+    """Map each client reference (id or email) to a client id with one query."""
+    ids = {int(reference) for reference in references if reference.isdigit()}
+    emails = {reference for reference in references if not reference.isdigit()}
+
+    resolved = {}
+    for client_id, email in Client.objects.filter(Q(pk__in=ids) | Q(email__in=emails)).values_list('id', 'email'):
+        if client_id in ids:
+            resolved[str(client_id)] = client_id
+        if email in emails:
+            resolved[email] = client_id
+    return resolved
+
+
+def _import_chunk(chunk, report):
+    """Validate and insert one chunk of rows; returns the number of debts created."""
+    valid_rows = validate_rows(chunk, DebtImportRowSerializer, report)
+    for _, data in valid_rows:
+        data['client'] = data['client'].strip()
+
+    if not valid_rows:
+        return 0
+
+    clients = _resolve_clients({data['client'] for _, data in valid_rows})
+    today = timezone.now().date()
+
+    debts = []
+    client_deltas = defaultdict(lambda: {'debt': 0, 'active': 0, 'overdue': 0})
+    for line_number, data in valid_rows:
+        client_id = clients.get(data['client'])
+        if client_id is None:
+            add_import_error(report, line_number, {'client': ['Client not found.']})
+            continue
+
+        # Same rule as Debt.save(): a new debt past its deadline starts OVERDUE
+        status = 'OVERDUE' if data['deadline'] < today else 'PENDING'
+        debts.append(Debt(
+            client_id=client_id,
+            amount=data['amount'],
+            description=data['description'],
+            deadline=data['deadline'],
+            status=status,
+            remaining_balance=data['amount']
+        ))
+
+        active, overdue = Debt.status_counts(status)
+        delta = client_deltas[client_id]
+        delta['debt'] += data['amount']
+        delta['active'] += active
+        delta['overdue'] += overdue
+
+    if not debts:
+        return 0
+
+    with transaction.atomic():
+        Debt.objects.bulk_create(debts)
+        for client_id, delta in client_deltas.items():
+            ClientBalanceSummary.apply_delta(client_id, **delta)
+
+    return len(debts)
@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from django.utils import timezone
+
+from debts.models import Debt
+from payments.models import Payment
+
+
+class Command(BaseCommand):
+    """Rebuild or verify the stored amount_paid/remaining_balance columns on Debt."""
+
+    help = 'Recompute Debt.amount_paid and Debt.remaining_balance from payments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only report debts whose stored balances have drifted; exit non-zero if any.'
+        )
+
+    def handle(self, *args, **options):
+        paid_subquery = Subquery(
+            Payment.objects.filter(debt=OuterRef('pk'))
+            .order_by()
+            .values('debt')
+            .annotate(total=Sum('amount'))
+            .values('total'),
+            output_field=DecimalField(max_digits=10, decimal_places=2)
+        )
+        actual_paid = Coalesce(
+            paid_subquery,
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=10, decimal_places=2)
+        )
+
+        # Rounded, since SQLite sums decimals as floats
+        drifted = Debt.objects.annotate(actual_paid=Round(actual_paid, 2)).filter(
+            ~Q(amount_paid=F('actual_paid'))
+            | ~Q(remaining_balance=Round(F('amount') - F('actual_paid'), 2))
+        )
+
+        if options['verify']:
+            mismatches = list(drifted.values_list('id', 'amount_paid', 'actual_paid')[:20])
+            count = drifted.count()
+            for debt_id, stored, actual in mismatches:
+                self.stdout.write(f'Debt {debt_id}: stored paid {stored}, actual paid {actual}')
+            if count:
+                raise CommandError(f'{count} debt(s) have drifted balances.')
+            self.stdout.write(self.style.SUCCESS('All debt balances are consistent.'))
+            return
+
+        with transaction.atomic():
+            updated = Debt.objects.update(
+                amount_paid=Round(actual_paid, 2),
+                remaining_balance=Round(F('amount') - actual_paid, 2),
+                updated_at=timezone.now()
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt balances for {updated} debt(s).'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from debts.sweeper import sweep_overdue_debts
+
+
+class Command(BaseCommand):
+    """Move pending debts past their deadline to OVERDUE."""
+
+    help = 'Mark pending debts whose deadline has passed as OVERDUE with a single UPDATE.'
+
+    def handle(self, *args, **options):
+        count, duration_ms = sweep_overdue_debts()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Marked {count} debt(s) as overdue in {duration_ms:.1f} ms.'
+        ))
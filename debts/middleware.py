@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .sweeper import sweep_overdue_debts
+
+
+class OverdueSweepMiddleware:
+    """
+    Run the overdue sweep at most once every OVERDUE_SWEEP_INTERVAL seconds,
+    piggybacking on incoming requests, so overdue statuses stay fresh even
+    when no cron job runs sweep_overdue. Set the interval to 0 to disable.
+    """
+    cache_key = 'debts:overdue_sweep:lock'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        interval = getattr(settings, 'OVERDUE_SWEEP_INTERVAL', 0)
+        # cache.add only succeeds for the first request after the key expires
+        if interval and cache.add(self.cache_key, True, timeout=interval):
+            sweep_overdue_debts()
+        return self.get_response(request)
@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-17 23:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def upper_case_statuses(apps, schema_editor):
+    Debt = apps.get_model('debts', 'Debt')
+    for status in ('PENDING', 'PAID', 'OVERDUE'):
+        Debt.objects.filter(status=status.title()).update(status=status)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('debts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='debt',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Debt', 'verbose_name_plural': 'Debts'},
+        ),
+        migrations.AlterModelTable(
+            name='debt',
+            table='debts',
+        ),
+        migrations.AddField(
+            model_name='debt',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='debt',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='debt',
+            name='description',
+            field=models.TextField(),
+        ),
+        migrations.AlterField(
+            model_name='debt',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PAID', 'Paid'), ('OVERDUE', 'Overdue')], default='PENDING', max_length=10),
+        ),
+        migrations.RunPython(upper_case_statuses, migrations.RunPython.noop),
+    ]
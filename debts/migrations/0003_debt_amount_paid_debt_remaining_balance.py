@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-17 09:12
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+
+def backfill_balances(apps, schema_editor):
+    Debt = apps.get_model('debts', 'Debt')
+    Payment = apps.get_model('payments', 'Payment')
+    actual_paid = Coalesce(
+        Subquery(
+            Payment.objects.filter(debt=OuterRef('pk'))
+            .order_by()
+            .values('debt')
+            .annotate(total=Sum('amount'))
+            .values('total')
+        ),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=10, decimal_places=2)
+    )
+    Debt.objects.update(
+        amount_paid=Round(actual_paid, 2),
+        remaining_balance=Round(F('amount') - actual_paid, 2)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debts', '0002_sync_with_models'),
+        ('payments', '0002_sync_with_models'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='debt',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='debt',
+            name='remaining_balance',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
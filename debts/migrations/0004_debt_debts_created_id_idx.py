@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debts', '0003_debt_amount_paid_debt_remaining_balance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(fields=['-created_at', '-id'], name='debts_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-17 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debts', '0004_debt_debts_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(fields=['status', 'deadline'], name='debts_status_deadline_idx'),
+        ),
+    ]
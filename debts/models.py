@@ -1,7 +1,38 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value, OuterRef, Subquery, Sum, DecimalField, ExpressionWrapper
+from django.db.models.functions import Coalesce, Round
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
+from clients.models import ClientBalanceSummary
+
+
+class DebtQuerySet(models.QuerySet):
+    """QuerySet for Debt model."""
+    
+    def with_balances(self):
+        """
+        Annotate debts with annotated_paid and annotated_remaining,
+        summed in SQL from the payments table and rounded, since SQLite
+        sums decimals as floats.
+        """
+        from payments.models import Payment
+        
+        money = DecimalField(max_digits=10, decimal_places=2)
+        paid = Payment.objects.filter(debt=OuterRef('pk')).order_by().values('debt')
+        
+        return self.annotate(
+            annotated_paid=Round(Coalesce(
+                Subquery(paid.annotate(total=Sum('amount')).values('total')),
+                Value(Decimal('0.00')),
+                output_field=money
+            ), 2)
+        ).annotate(
+            annotated_remaining=Round(
+                ExpressionWrapper(F('amount') - F('annotated_paid'), output_field=money), 2
+            )
+        )
 
 
 class Debt(models.Model):
@@ -24,12 +55,26 @@ class Debt(models.Model):
     date = models.DateField(auto_now_add=True)
     deadline = models.DateField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    # Denormalized from payments; maintained by Payment.save()/delete()
+    # and rebuilt with the rebuild_debt_balances command.
+    amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    remaining_balance = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = DebtQuerySet.as_manager()
+    
     class Meta:
         db_table = 'debts'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination over Meta.ordering + id
+            models.Index(fields=['-created_at', '-id'], name='debts_created_id_idx'),
+            # Upcoming/overdue/pending lookups
+            models.Index(fields=['status', 'deadline'], name='debts_status_deadline_idx'),
+            # Latest change, for the ETag validators
+            models.Index(fields=['updated_at'], name='debts_updated_idx'),
+        ]
         verbose_name = 'Debt'
         verbose_name_plural = 'Debts'
     
@@ -37,13 +82,33 @@ class Debt(models.Model):
         return f"{self.client.name} - ${self.amount} - {self.status}"
     
     def get_amount_paid(self):
-        """Calculate total amount paid towards this debt."""
-        return sum(payment.amount for payment in self.payments.all())
+        """Get total amount paid towards this debt."""
+        if hasattr(self, 'annotated_paid'):
+            return self.annotated_paid
+        return self.amount_paid
     
     def get_remaining_balance(self):
-        """Calculate remaining balance for this debt."""
+        """Get remaining balance for this debt."""
         return self.amount - self.get_amount_paid()
     
+    def apply_payment(self, amount):
+        """
+        Add a payment amount (negative to reverse one) to the stored
+        paid/remaining columns and refresh the debt status.
+        """
+        # Rounded, since SQLite adds decimals as floats
+        Debt.objects.filter(pk=self.pk).update(
+            amount_paid=Round(F('amount_paid') + amount, 2),
+            remaining_balance=Round(F('remaining_balance') - amount, 2)
+        )
+        self.refresh_from_db(fields=['amount_paid', 'remaining_balance'])
+        
+        # Reopen a paid debt when a payment is reversed
+        if amount < 0 and self.status == 'PAID' and self.remaining_balance > 0:
+            self.status = 'PENDING'
+        
+        self.save(update_fields=['status', 'remaining_balance', 'updated_at'])
+    
     def is_overdue(self):
         """Check if debt is overdue."""
         return timezone.now().date() > self.deadline and self.status != 'PAID'
@@ -59,12 +124,68 @@ class Debt(models.Model):
     
     def save(self, *args, **kwargs):
         """Override save to automatically update status."""
+        self.remaining_balance = self.amount - self.amount_paid
+        
         # Auto-update status to OVERDUE if past deadline
         if self.is_overdue() and self.status == 'PENDING':
             self.status = 'OVERDUE'
         
         # Auto-update status to PAID if fully paid (only if debt already exists)
-        if self.pk and self.get_remaining_balance() <= 0 and self.status != 'PAID':
+        if self.pk and self.remaining_balance <= 0 and self.status != 'PAID':
             self.status = 'PAID'
         
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Debt.objects.filter(pk=self.pk).values('client_id', 'amount', 'status').first()
+            
+            super().save(*args, **kwargs)
+            self._update_client_summary(previous)
+    
+    def delete(self, *args, **kwargs):
+        """Override delete to remove this debt and its payments from the client summary."""
+        from payments.models import PaymentDailyRollup
+        
+        with transaction.atomic():
+            # Its payments are cascade-deleted without Payment.delete()
+            payment_dates = list(self.payments.order_by().values_list('date', flat=True).distinct())
+            result = super().delete(*args, **kwargs)
+            if payment_dates:
+                PaymentDailyRollup.rebuild(dates=payment_dates)
+            
+            active, overdue = self.status_counts(self.status)
+            ClientBalanceSummary.apply_delta(
+                self.client_id,
+                debt=-self.amount,
+                paid=-self.amount_paid,
+                active=-active,
+                overdue=-overdue,
+                refresh_last_payment=bool(self.amount_paid)
+            )
+        return result
+    
+    @staticmethod
+    def status_counts(status):
+        """Get the (active, overdue) summary counters contributed by a status."""
+        return int(status == 'PENDING'), int(status == 'OVERDUE')
+    
+    def _update_client_summary(self, previous):
+        """Apply the change in amount and status from a save to the client summary."""
+        debt = self.amount
+        active, overdue = self.status_counts(self.status)
+        
+        if previous:
+            previous_active, previous_overdue = self.status_counts(previous['status'])
+            if previous['client_id'] == self.client_id:
+                debt -= previous['amount']
+                active -= previous_active
+                overdue -= previous_overdue
+            else:
+                ClientBalanceSummary.apply_delta(
+                    previous['client_id'],
+                    debt=-previous['amount'],
+                    active=-previous_active,
+                    overdue=-previous_overdue
+                )
+        
+        ClientBalanceSummary.apply_delta(self.client_id, debt=debt, active=active, overdue=overdue)
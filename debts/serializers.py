@@ -1,9 +1,11 @@
 from rest_framework import serializers
+from Client_Debt_Control_System.fieldsets import SparseFieldsetSerializerMixin
+from Client_Debt_Control_System.instrumentation import TimedSerializerMixin
 from .models import Debt
 from clients.serializers import ClientSerializer
 
 
-class DebtSerializer(serializers.ModelSerializer):
+class DebtSerializer(SparseFieldsetSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Debt model."""
     
     client_name = serializers.CharField(source='client.name', read_only=True)
@@ -13,6 +15,13 @@ class DebtSerializer(serializers.ModelSerializer):
     days_until_deadline = serializers.SerializerMethodField()
     is_overdue = serializers.SerializerMethodField()
     
+    sparse_dependencies = {
+        'amount_paid': ['amount_paid'],
+        'remaining_balance': ['amount', 'amount_paid'],
+        'days_until_deadline': ['deadline'],
+        'is_overdue': ['deadline', 'status'],
+    }
+    
     class Meta:
         model = Debt
         fields = [
@@ -66,4 +75,22 @@ class DebtDetailSerializer(DebtSerializer):
     def get_payments(self, obj):
         """Get all payments for this debt."""
         from payments.serializers import PaymentSerializer
-        return PaymentSerializer(obj.payments.all(), many=True).data
+        return PaymentSerializer(obj.payments.select_related('client', 'debt'), many=True).data
+
+
+class DebtImportRowSerializer(serializers.Serializer):
+    """
+    Field validation for one row of a batch debt creation.
+    Clients are resolved per chunk by the importer.
+    """
+    
+    client = serializers.CharField(help_text='Client id or email')
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    description = serializers.CharField()
+    deadline = serializers.DateField()
+    
+    def validate_amount(self, value):
+        """Validate debt amount is positive."""
+        if value <= 0:
+            raise serializers.ValidationError("Amount must be greater than zero.")
+        return value
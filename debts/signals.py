@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+
+# Sent after sweep_overdue_debts() bulk-moves debts to OVERDUE, which
+# bypasses the model save signals. Provides ``count``.
+overdue_swept = Signal()
+
+# Sent after import_debts() bulk-creates debts, which bypasses the model
+# save signals. Provides ``count``.
+debts_imported = Signal()
@@ -0,0 +1,45 @@
+"""
+Bulk PENDING -> OVERDUE transition for debts past their deadline.
+"""
+import logging
+import time
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.utils import timezone
+
+from clients.models import ClientBalanceSummary
+from .models import Debt
+from .signals import overdue_swept
+
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_overdue_debts():
+    """
+    Mark every pending debt whose deadline has passed as OVERDUE with a
+    single UPDATE and move them between the client summary counters.
+    Idempotent; returns (debts updated, duration in milliseconds).
+    """
+    started = time.monotonic()
+    today = timezone.now().date()
+    due = Debt.objects.filter(status='PENDING', deadline__lt=today)
+    per_client = Subquery(
+        due.filter(client=OuterRef('client')).order_by().values('client').annotate(n=Count('id')).values('n')
+    )
+
+    with transaction.atomic():
+        ClientBalanceSummary.objects.filter(client__in=due.values('client')).update(
+            active_debts_count=F('active_debts_count') - per_client,
+            overdue_debts_count=F('overdue_debts_count') + per_client,
+            updated_at=timezone.now()
+        )
+        count = due.update(status='OVERDUE', updated_at=timezone.now())
+
+    duration_ms = (time.monotonic() - started) * 1000
+    logger.info('Overdue sweep moved %d debt(s) to OVERDUE in %.1f ms', count, duration_ms)
+
+    if count:
+        overdue_swept.send(sender=Debt, count=count)
+    return count, duration_ms
@@ -1,3 +1,347 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from clients.models import Client, ClientBalanceSummary
+from payments.models import Payment
+from .middleware import OverdueSweepMiddleware
+from .models import Debt
+from .sweeper import sweep_overdue_debts
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class DebtActionQueryCountTests(APITestCase):
+    """The debt list actions run as many queries however many debts they show."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date()
+
+    def create_debts(self, count):
+        """Create ``count`` overdue and ``count`` upcoming debts, each partly paid."""
+        for deadline in [self.today - timedelta(days=3), self.today + timedelta(days=3)]:
+            for _ in range(count):
+                debt = Debt.objects.create(
+                    client=self.user, amount=Decimal('100.00'), description='Loan', deadline=deadline
+                )
+                Payment(client=self.user, debt=debt, amount=Decimal('40.00')).save()
+
+    def measure(self, expected_rows):
+        """Get {action: query count}, checking each page's rows and balances."""
+        counts = {}
+        for name in ['overdue', 'pending', 'upcoming']:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse(f'debt:debt-{name}'))
+            self.assertEqual(response.status_code, 200)
+            rows = response.data['results']
+            self.assertEqual(len(rows), expected_rows)
+            self.assertEqual({(row['amount_paid'], row['remaining_balance']) for row in rows}, {(40.0, 60.0)})
+            counts[name] = len(context.captured_queries)
+        return counts
+
+    def test_query_counts_do_not_grow_with_debts(self):
+        self.create_debts(2)
+        small = self.measure(2)
+
+        self.create_debts(20)
+        self.assertEqual(self.measure(22), small)
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class DebtBatchTests(APITestCase):
+    """Tests for batch debt creation."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='client@example.com', name='Client', phone='555-0101', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('debt:debt-batch')
+        today = timezone.now().date()
+        self.future = (today + timedelta(days=10)).isoformat()
+        self.past = (today - timedelta(days=1)).isoformat()
+
+    def test_creates_debts_from_a_json_list(self):
+        response = self.client.post(self.url, [
+            {'client': self.user.pk, 'amount': '50.00', 'description': 'Loan', 'deadline': self.future},
+            {'client': 'client@example.com', 'amount': '25.00', 'description': 'Rent', 'deadline': self.past},
+            {'client': 'nobody@example.com', 'amount': '10.00', 'description': 'Loan', 'deadline': self.future},
+            'not an object',
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 2))
+        self.assertEqual(
+            {error['line']: error['errors'] for error in response.data['errors']},
+            {
+                3: {'client': ['Client not found.']},
+                4: {'non_field_errors': ['Each item must be an object.']},
+            }
+        )
+        self.assertEqual(
+            dict(Debt.objects.values_list('description', 'status')),
+            {'Loan': 'PENDING', 'Rent': 'OVERDUE'}
+        )
+
+        summary = ClientBalanceSummary.objects.get(client=self.user)
+        self.assertEqual(summary.total_debt, Decimal('75.00'))
+        self.assertEqual(ClientBalanceSummary.reconcile(dry_run=True), 0)
+
+    def test_creates_debts_from_a_file(self):
+        content = (
+            'client,amount,description,deadline\n'
+            f' client@example.com ,40.00,Loan,{self.future}\n'
+            f'{self.user.pk},0,Free,{self.future}\n'
+        ).encode() + b'\xff,1.00,Bad,2030-01-01\n'
+        response = self.client.post(
+            self.url, {'file': SimpleUploadedFile('debts.csv', content)}, format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 2))
+        errors = {error['line']: error['errors'] for error in response.data['errors']}
+        self.assertIn('amount', errors[3])
+        self.assertIn('Invalid UTF-8', errors[4]['non_field_errors'][0])
+        self.assertEqual(Debt.objects.get().client, self.user)
+
+    def test_rejects_a_request_without_rows(self):
+        response = self.client.post(self.url, {'client': self.user.pk}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Debt.objects.exists())
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class DebtExportTests(APITestCase):
+    """Tests for the streaming debt export."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='client@example.com', name='Client', phone='555-0101', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        today = timezone.now().date()
+        self.pending = Debt.objects.create(
+            client=self.user, amount=Decimal('50.00'), description='Loan, "short"',
+            deadline=today + timedelta(days=10)
+        )
+        self.overdue = Debt.objects.create(
+            client=self.user, amount=Decimal('20.00'), description='Rent',
+            deadline=today - timedelta(days=1)
+        )
+        self.url = reverse('debt:debt-export')
+
+    def export(self, query):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_honours_the_list_filters(self):
+        response, content = self.export('?status=pending')
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertRegex(response['Content-Disposition'], r'attachment; filename="debts-\d{4}-\d{2}-\d{2}\.csv"')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], str(self.pending.pk))
+        self.assertEqual(rows[0]['description'], 'Loan, "short"')
+        self.assertEqual(rows[0]['client__email'], 'client@example.com')
+
+    def test_ndjson_has_one_object_per_line(self):
+        response, content = self.export('?export_format=ndjson')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual({row['id']: row['status'] for row in rows}, {
+            self.pending.pk: 'PENDING',
+            self.overdue.pk: 'OVERDUE',
+        })
+        self.assertEqual(rows[0]['amount'], '20.00')
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(self.url + '?export_format=xlsx')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unsupported export format', response.data['error'])
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class DebtConditionalGetTests(APITestCase):
+    """Tests for the debt list's ETag / Last-Modified validators."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='client@example.com', name='Client', phone='555-0101', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        Debt.objects.create(
+            client=self.user, amount=Decimal('50.00'), description='Loan',
+            deadline=timezone.now().date() + timedelta(days=1)
+        )
+        self.url = reverse('debt:debt-list')
+
+    def test_validators_change_at_midnight(self):
+        response = self.client.get(self.url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(response.data['results'][0]['days_until_deadline'], 1)
+
+        tomorrow = timezone.now() + timedelta(days=1)
+        with mock.patch('django.utils.timezone.now', return_value=tomorrow):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['results'][0]['days_until_deadline'], 0)
+
+            response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 200)
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class DebtBalanceTests(TestCase):
+    """Tests for the stored paid/remaining balances on Debt."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='client@example.com', name='Client', phone='555-0101', password='secret'
+        )
+        self.debt = Debt.objects.create(
+            client=self.user, amount=Decimal('10.00'), description='Loan',
+            deadline=timezone.now().date() + timedelta(days=10)
+        )
+
+    def pay(self, amount):
+        return Payment.objects.create(client=self.user, debt=self.debt, amount=Decimal(amount))
+
+    def verify(self):
+        call_command('rebuild_debt_balances', '--verify', stdout=io.StringIO())
+
+    def test_balances_stay_consistent_through_payment_edits_and_deletes(self):
+        first = self.pay('0.10')
+        self.pay('0.20')
+        self.verify()
+        third = self.pay('0.37')
+        first.amount = Decimal('0.30')
+        first.save()
+        self.verify()
+        third.delete()
+        self.verify()
+        self.pay('9.50')
+
+        self.debt.refresh_from_db()
+        self.assertEqual(self.debt.amount_paid, Decimal('10.00'))
+        self.assertEqual(self.debt.remaining_balance, Decimal('0.00'))
+        self.assertEqual(self.debt.status, 'PAID')
+        self.verify()
+
+    def test_rebuild_repairs_drifted_balances(self):
+        self.pay('0.10')
+        self.pay('0.20')
+        Debt.objects.filter(pk=self.debt.pk).update(amount_paid=Decimal('1.00'))
+
+        self.assertTrue(Debt.objects.with_balances().filter(
+            annotated_paid=Decimal('0.30'), annotated_remaining=Decimal('9.70')
+        ).exists())
+
+        with self.assertRaises(CommandError):
+            self.verify()
+        call_command('rebuild_debt_balances', stdout=io.StringIO())
+        self.verify()
+        self.debt.refresh_from_db()
+        self.assertEqual(self.debt.remaining_balance, Decimal('9.70'))
+
+    def test_admin_has_no_bulk_delete_bypassing_the_balances(self):
+        request = RequestFactory().get('/admin/')
+        request.user = Client.objects.create_superuser(
+            email='admin@example.com', name='Admin', phone='555-0100', password='secret'
+        )
+
+        for model in (Debt, Payment):
+            with self.subTest(model=model.__name__):
+                self.assertNotIn('delete_selected', admin.site._registry[model].get_actions(request))
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class OverdueSweepTests(APITestCase):
+    """Tests for the bulk overdue sweep and its request-driven hook."""
+
+    def setUp(self):
+        cache.delete(OverdueSweepMiddleware.cache_key)
+        self.first = Client.objects.create_user(
+            email='first@example.com', name='First', phone='555-0101', password='secret'
+        )
+        self.second = Client.objects.create_user(
+            email='second@example.com', name='Second', phone='555-0102', password='secret'
+        )
+        today = timezone.now().date()
+        for client, amount in [(self.first, '10.00'), (self.first, '20.00'), (self.second, '30.00')]:
+            self.debt(client, amount, today + timedelta(days=1))
+        self.debt(self.second, '40.00', today + timedelta(days=5))
+        # Past their deadline without having been saved since
+        Debt.objects.filter(deadline=today + timedelta(days=1)).update(deadline=today - timedelta(days=1))
+
+    def debt(self, client, amount, deadline):
+        return Debt.objects.create(client=client, amount=Decimal(amount), description='Loan', deadline=deadline)
+
+    def counters(self):
+        return {
+            summary.client_id: (summary.active_debts_count, summary.overdue_debts_count)
+            for summary in ClientBalanceSummary.objects.all()
+        }
+
+    def test_sweep_marks_due_debts_with_one_update(self):
+        with CaptureQueriesContext(connection) as context:
+            count, _ = sweep_overdue_debts()
+
+        self.assertEqual(count, 3)
+        debt_updates = [query for query in context.captured_queries if query['sql'].startswith('UPDATE "debts"')]
+        self.assertEqual(len(debt_updates), 1)
+        self.assertEqual(
+            sorted(Debt.objects.values_list('amount', 'status')),
+            [(Decimal('10.00'), 'OVERDUE'), (Decimal('20.00'), 'OVERDUE'),
+             (Decimal('30.00'), 'OVERDUE'), (Decimal('40.00'), 'PENDING')]
+        )
+        self.assertEqual(self.counters(), {self.first.pk: (0, 2), self.second.pk: (1, 1)})
+        self.assertEqual(ClientBalanceSummary.reconcile(dry_run=True), 0)
+
+    def test_sweeping_again_changes_nothing(self):
+        sweep_overdue_debts()
+        counters = self.counters()
+
+        count, _ = sweep_overdue_debts()
+
+        self.assertEqual(count, 0)
+        self.assertEqual(self.counters(), counters)
+        self.assertEqual(ClientBalanceSummary.reconcile(dry_run=True), 0)
+
+    @override_settings(OVERDUE_SWEEP_INTERVAL=60)
+    def test_middleware_sweeps_once_per_interval(self):
+        self.client.force_authenticate(user=self.first)
+
+        self.client.get(reverse('debt:debt-list'))
+        self.assertFalse(Debt.objects.filter(status='PENDING', deadline__lt=timezone.now().date()).exists())
+
+        # Within the interval the next request does not sweep again
+        Debt.objects.filter(amount=Decimal('40.00')).update(deadline=timezone.now().date() - timedelta(days=1))
+        self.client.get(reverse('debt:debt-list'))
+        self.assertEqual(Debt.objects.get(amount=Decimal('40.00')).status, 'PENDING')
+
+        cache.delete(OverdueSweepMiddleware.cache_key)
+        self.client.get(reverse('debt:debt-list'))
+        self.assertEqual(Debt.objects.get(amount=Decimal('40.00')).status, 'OVERDUE')
+        self.assertEqual(self.counters(), {self.first.pk: (0, 2), self.second.pk: (0, 2)})
@@ -4,12 +4,27 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import JSONParser, MultiPartParser
 from django.utils import timezone
+from Client_Debt_Control_System.conditional import ConditionalGetMixin
+from Client_Debt_Control_System.fieldsets import SparseFieldsetMixin
+from Client_Debt_Control_System.uploads import UPLOAD_FORMATS, get_upload_format, iter_upload_rows
+from Client_Debt_Control_System.exports import ExportMixin
+from clients.models import Client
+from payments.models import Payment
 from .models import Debt
+from .importer import import_debts
 from .serializers import DebtSerializer, DebtDetailSerializer
 
 
-class DebtViewSet(viewsets.ModelViewSet):
+DEBT_EXPORT_FIELDS = [
+    'id', 'client_id', 'client__name', 'client__email',
+    'amount', 'amount_paid', 'remaining_balance', 'description',
+    'date', 'deadline', 'status', 'created_at', 'updated_at'
+]
+
+
+class DebtViewSet(ExportMixin, SparseFieldsetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Debt model.
     Provides CRUD operations and custom actions.
@@ -17,6 +32,11 @@ class DebtViewSet(viewsets.ModelViewSet):
     queryset = Debt.objects.all()
     serializer_class = DebtSerializer
     permission_classes = [IsAuthenticated]
+    export_fields = DEBT_EXPORT_FIELDS
+    export_name = 'debts'
+    conditional_related_models = [Client]
+    replica_actions = ['list', 'retrieve', 'export', 'overdue', 'pending', 'upcoming']
+    sparse_fieldset_actions = ['list', 'retrieve', 'overdue', 'pending', 'upcoming']
     
     def get_queryset(self):
         """Filter debts based on query parameters."""
@@ -40,7 +60,18 @@ class DebtViewSet(viewsets.ModelViewSet):
                 status='PENDING'
             )
         
-        return queryset.select_related('client')
+        # Only join clients and sum payments for fields that show them
+        if self.wants_fields('client', 'client_name', 'client_email'):
+            queryset = queryset.select_related('client')
+        if self.wants_fields('amount_paid', 'remaining_balance'):
+            queryset = queryset.with_balances()
+        return self.sparse_queryset(queryset)
+    
+    def get_conditional_related_models(self):
+        """The detail view also lists the debt's payments."""
+        if self.action == 'retrieve':
+            return self.conditional_related_models + [Payment]
+        return self.conditional_related_models
     
     def get_serializer_class(self):
         """Use detailed serializer for retrieve action."""
@@ -48,32 +79,66 @@ class DebtViewSet(viewsets.ModelViewSet):
             return DebtDetailSerializer
         return DebtSerializer
     
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, MultiPartParser])
+    def batch(self, request):
+        """
+        Create many debts at once, from a JSON list or an uploaded CSV or
+        JSON Lines "file". Fields: client (id or email), amount,
+        description, deadline. Returns the number of created and failed
+        rows and per-row errors.
+        """
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file:
+            fmt = get_upload_format(uploaded_file, request.data.get('format'))
+            if fmt not in UPLOAD_FORMATS:
+                return Response(
+                    {'error': f'Unsupported format; use one of {", ".join(UPLOAD_FORMATS)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            rows = iter_upload_rows(uploaded_file, fmt)
+        elif isinstance(request.data, list):
+            rows = (
+                (index, row, None) if isinstance(row, dict) else (index, None, 'Each item must be an object.')
+                for index, row in enumerate(request.data, start=1)
+            )
+        else:
+            return Response(
+                {'error': 'Send a JSON list of debts or upload them as a "file" field'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        report = import_debts(rows)
+        return Response(report)
+    
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get all overdue debts."""
-        overdue_debts = Debt.objects.filter(status='OVERDUE')
-        serializer = self.get_serializer(overdue_debts, many=True)
-        return Response(serializer.data)
+        overdue_debts = self.get_queryset().filter(status='OVERDUE')
+        page = self.paginate_queryset(overdue_debts)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get all pending debts."""
-        pending_debts = Debt.objects.filter(status='PENDING')
-        serializer = self.get_serializer(pending_debts, many=True)
-        return Response(serializer.data)
+        pending_debts = self.get_queryset().filter(status='PENDING')
+        page = self.paginate_queryset(pending_debts)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
         """Get debts due in the next 7 days."""
         today = timezone.now().date()
         upcoming_date = today + timezone.timedelta(days=7)
-        upcoming_debts = Debt.objects.filter(
+        upcoming_debts = self.get_queryset().filter(
             deadline__gte=today,
             deadline__lte=upcoming_date,
             status='PENDING'
         )
-        serializer = self.get_serializer(upcoming_debts, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(upcoming_debts)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def mark_paid(self, request, pk=None):
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Notification
+from .dispatch import claim_due_notifications, send_notifications
 
 
 @admin.register(Notification)
@@ -34,11 +35,8 @@ class NotificationAdmin(admin.ModelAdmin):
     
     def send_notifications(self, request, queryset):
         """Admin action to manually send pending notifications."""
-        count = 0
-        for notification in queryset.filter(status='PENDING'):
-            notification.send_email()
-            if notification.status == 'SENT':
-                count += 1
+        notifications = claim_due_notifications(batch_size=queryset.count(), queryset=queryset)
+        count, _ = send_notifications(notifications)
         
         self.message_user(request, f'{count} notification(s) sent successfully.')
     send_notifications.short_description = 'Send selected notifications'
@@ -0,0 +1,131 @@
+"""
+Batched notification dispatch.
+
+Due notifications are claimed in batches with a compare-and-set UPDATE
+(PENDING -> SENDING), so several workers can run side by side without
+sending the same email twice. Each claimed batch is split across a thread
+pool; every thread sends its share over one reused mail connection, and
+the outcomes are written back with a single bulk_update.
+"""
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.mail import get_connection
+from django.utils import timezone
+
+from .models import Notification
+
+
+def claim_due_notifications(batch_size=100, queryset=None):
+    """
+    Claim up to ``batch_size`` pending notifications and return them.
+    Defaults to the notifications whose scheduled time has passed.
+    """
+    now = timezone.now()
+    if queryset is None:
+        queryset = Notification.objects.filter(scheduled_for__lte=now)
+
+    candidate_ids = list(
+        queryset.filter(status='PENDING')
+        .order_by('scheduled_for', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not candidate_ids:
+        return []
+
+    # Only rows still PENDING are taken; rows another worker claimed first are skipped
+    token = uuid.uuid4().hex
+    Notification.objects.filter(id__in=candidate_ids, status='PENDING').update(
+        status='SENDING',
+        claimed_by=token,
+        claimed_at=now,
+        updated_at=now
+    )
+
+    return list(
+        Notification.objects.filter(id__in=candidate_ids, claimed_by=token, status='SENDING')
+        .order_by('scheduled_for', 'id')
+    )
+
+
+def release_stale_claims(older_than):
+    """Return notifications claimed more than ``older_than`` ago (a timedelta) to PENDING."""
+    return Notification.objects.filter(
+        status='SENDING',
+        claimed_at__lt=timezone.now() - older_than
+    ).update(status='PENDING', claimed_by=None, claimed_at=None, updated_at=timezone.now())
+
+
+def _send_over_one_connection(notifications):
+    """Send notifications over a single mail connection; map id -> error (None if sent)."""
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        return {notification.pk: str(e) for notification in notifications}
+
+    results = {}
+    try:
+        for notification in notifications:
+            try:
+                connection.send_messages([notification.build_message(connection)])
+                results[notification.pk] = None
+            except Exception as e:
+                results[notification.pk] = str(e)
+    finally:
+        connection.close()
+    return results
+
+
+def send_notifications(notifications, workers=4):
+    """
+    Send claimed notifications with a pool of ``workers`` connections and
+    record the results. Returns (sent_count, failed_count).
+    """
+    if not notifications:
+        return 0, 0
+
+    workers = max(1, min(workers, len(notifications)))
+    chunks = [notifications[i::workers] for i in range(workers)]
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk_results in executor.map(_send_over_one_connection, chunks):
+            results.update(chunk_results)
+
+    sent_at = timezone.now()
+    sent_count = 0
+    for notification in notifications:
+        notification.updated_at = sent_at
+        error = results[notification.pk]
+        if error is None:
+            notification.status = 'SENT'
+            notification.sent_at = sent_at
+            notification.error_message = None
+            sent_count += 1
+        else:
+            notification.status = 'FAILED'
+            notification.error_message = error
+
+    Notification.objects.bulk_update(notifications, ['status', 'sent_at', 'error_message', 'updated_at'])
+    return sent_count, len(notifications) - sent_count
+
+
+def dispatch_due_notifications(batch_size=100, workers=4, max_batches=None):
+    """
+    Claim and send due notifications batch by batch until none are left
+    (or ``max_batches`` is reached). Returns (sent_count, failed_count).
+    """
+    sent_total = failed_total = batches = 0
+
+    while max_batches is None or batches < max_batches:
+        notifications = claim_due_notifications(batch_size)
+        if not notifications:
+            break
+
+        sent, failed = send_notifications(notifications, workers)
+        sent_total += sent
+        failed_total += failed
+        batches += 1
+
+    return sent_total, failed_total
@@ -0,0 +1,60 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from notifications.dispatch import dispatch_due_notifications, release_stale_claims
+
+
+class Command(BaseCommand):
+    """Send due notifications in batches; safe to run as several concurrent workers."""
+
+    help = 'Claim due notifications in batches and send them over reused mail connections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of notifications claimed per batch.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of sending threads (one mail connection each).'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for due notifications instead of exiting when none are left.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30,
+            help='Seconds to sleep between polls when running with --loop.'
+        )
+        parser.add_argument(
+            '--reclaim-after',
+            type=int,
+            default=900,
+            help='Seconds after which a SENDING claim is treated as abandoned and re-queued.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_stale_claims(timedelta(seconds=options['reclaim_after']))
+            if released:
+                self.stdout.write(f'Re-queued {released} abandoned notification(s).')
+
+            sent, failed = dispatch_due_notifications(
+                batch_size=options['batch_size'],
+                workers=options['workers']
+            )
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Sent {sent} notification(s), {failed} failed.'))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,77 @@
+# Generated by Django 6.0 on 2026-10-17 23:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def upper_case_statuses(apps, schema_editor):
+    Notification = apps.get_model('notifications', 'Notification')
+    for status in ('PENDING', 'SENT', 'FAILED'):
+        Notification.objects.filter(status=status.title()).update(status=status)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('debts', '0002_sync_with_models'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='notification',
+            options={'ordering': ['-scheduled_for'], 'verbose_name': 'Notification', 'verbose_name_plural': 'Notifications'},
+        ),
+        migrations.AlterModelTable(
+            name='notification',
+            table='notifications',
+        ),
+        migrations.RemoveField(
+            model_name='notification',
+            name='vendor_phone',
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='debt',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='debts.debt'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='error_message',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='recipient_email',
+            field=models.EmailField(default='', max_length=254),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='subject',
+            field=models.CharField(default='', max_length=200),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='vendor_email',
+            field=models.EmailField(default='webmaster@localhost', max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=10),
+        ),
+        migrations.RunPython(upper_case_statuses, migrations.RunPython.noop),
+    ]
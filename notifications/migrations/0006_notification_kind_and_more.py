@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-17 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_claimed_at_notification_claimed_by_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('MANUAL', 'Manual'), ('REMINDER', 'Debt Reminder')], default='MANUAL', max_length=10),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'REMINDER'), ('status__in', ['PENDING', 'SENDING', 'SENT'])), fields=('debt',), name='notif_one_live_reminder_per_debt'),
+        ),
+    ]
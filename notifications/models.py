@@ -1,7 +1,25 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
+from django.db.models import Exists, OuterRef, Q
+
+
+REMINDER_SUBJECT = 'Payment Reminder - Debt Due on {deadline}'
+
+REMINDER_MESSAGE = """Dear {client_name},
+
+This is a reminder that you have an outstanding debt:
+
+Amount: ${amount:.2f}
+Description: {description}
+Deadline: {deadline}
+Remaining Balance: ${remaining:.2f}
+
+Please ensure payment is made before the deadline.
+
+Thank you,
+Debt Control System"""
 
 
 class Notification(models.Model):
@@ -10,10 +28,16 @@ class Notification(models.Model):
     """
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
         ('SENT', 'Sent'),
         ('FAILED', 'Failed'),
     ]
     
+    KIND_CHOICES = [
+        ('MANUAL', 'Manual'),
+        ('REMINDER', 'Debt Reminder'),
+    ]
+    
     client = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -33,28 +57,53 @@ class Notification(models.Model):
     scheduled_for = models.DateTimeField()
     sent_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='MANUAL')
     error_message = models.TextField(blank=True, null=True)
+    # Set when a dispatch worker claims the notification (status SENDING)
+    claimed_by = models.CharField(max_length=32, blank=True, null=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'notifications'
         ordering = ['-scheduled_for']
+        indexes = [
+            # Keyset pagination over Meta.ordering + id
+            models.Index(fields=['-scheduled_for', '-id'], name='notif_scheduled_id_idx'),
+            # Due notifications for send_pending
+            models.Index(fields=['status', 'scheduled_for'], name='notif_status_scheduled_idx'),
+            # Latest change, for the ETag validators
+            models.Index(fields=['updated_at'], name='notif_updated_idx'),
+        ]
+        constraints = [
+            # At most one live reminder per debt, so concurrent reminder runs can't duplicate
+            models.UniqueConstraint(
+                fields=['debt'],
+                condition=Q(kind='REMINDER', status__in=['PENDING', 'SENDING', 'SENT']),
+                name='notif_one_live_reminder_per_debt'
+            ),
+        ]
         verbose_name = 'Notification'
         verbose_name_plural = 'Notifications'
     
     def __str__(self):
         return f"Notification to {self.client.name} - {self.status}"
     
+    def build_message(self, connection=None):
+        """Build the email message for this notification."""
+        return EmailMessage(
+            subject=self.subject,
+            body=self.message,
+            from_email=self.vendor_email,
+            to=[self.recipient_email],
+            connection=connection,
+        )
+    
     def send_email(self):
         """Send the email notification."""
         try:
-            send_mail(
-                subject=self.subject,
-                message=self.message,
-                from_email=self.vendor_email,
-                recipient_list=[self.recipient_email],
-                fail_silently=False,
-            )
+            self.build_message().send(fail_silently=False)
             self.status = 'SENT'
             self.sent_at = timezone.now()
             self.error_message = None
@@ -64,6 +113,24 @@ class Notification(models.Model):
         
         self.save()
     
+    def is_superseded(self):
+        """Check whether another live reminder has replaced this (failed) one."""
+        return self.kind == 'REMINDER' and Notification.objects.filter(
+            debt_id=self.debt_id,
+            kind='REMINDER',
+            status__in=['PENDING', 'SENDING', 'SENT']
+        ).exclude(pk=self.pk).exists()
+    
+    @staticmethod
+    def _reminder_schedule(deadline):
+        """Reminders are sent at midnight, 2 days before the deadline."""
+        return timezone.make_aware(
+            timezone.datetime.combine(
+                deadline - timezone.timedelta(days=2),
+                timezone.datetime.min.time()
+            )
+        )
+    
     @classmethod
     def create_debt_reminder(cls, debt, vendor_email=None):
         """
@@ -73,36 +140,85 @@ class Notification(models.Model):
         if not vendor_email:
             vendor_email = settings.DEFAULT_FROM_EMAIL
         
-        scheduled_time = timezone.make_aware(
-            timezone.datetime.combine(
-                debt.deadline - timezone.timedelta(days=2),
-                timezone.datetime.min.time()
-            )
-        )
-        
-        message = f"""
-Dear {debt.client.name},
-
-This is a reminder that you have an outstanding debt:
-
-Amount: ${debt.amount}
-Description: {debt.description}
-Deadline: {debt.deadline.strftime('%B %d, %Y')}
-Remaining Balance: ${debt.get_remaining_balance()}
-
-Please ensure payment is made before the deadline.
-
-Thank you,
-Debt Control System
-        """
+        deadline = debt.deadline.strftime('%B %d, %Y')
         
         return cls.objects.create(
             client=debt.client,
             debt=debt,
             recipient_email=debt.client.email,
             vendor_email=vendor_email,
-            subject=f'Payment Reminder - Debt Due on {debt.deadline.strftime("%B %d, %Y")}',
-            message=message.strip(),
-            scheduled_for=scheduled_time,
-            status='PENDING'
+            subject=REMINDER_SUBJECT.format(deadline=deadline),
+            message=REMINDER_MESSAGE.format(
+                client_name=debt.client.name,
+                amount=debt.amount,
+                description=debt.description,
+                deadline=deadline,
+                remaining=debt.get_remaining_balance()
+            ),
+            scheduled_for=cls._reminder_schedule(debt.deadline),
+            status='PENDING',
+            kind='REMINDER'
+        )
+    
+    @classmethod
+    def create_debt_reminders(cls, vendor_email=None):
+        """
+        Create reminders for every pending debt due in 2 days that has no
+        pending, sending or sent notification yet.
+        Uses one SELECT and one bulk INSERT; the live-reminder constraint
+        makes concurrent runs skip debts that were reminded meanwhile.
+        Returns the number of reminders created.
+        """
+        from debts.models import Debt
+        
+        if not vendor_email:
+            vendor_email = settings.DEFAULT_FROM_EMAIL
+        
+        deadline = timezone.now().date() + timezone.timedelta(days=2)
+        deadline_text = deadline.strftime('%B %d, %Y')
+        live_notifications = cls.objects.filter(
+            debt=OuterRef('pk'),
+            status__in=['PENDING', 'SENDING', 'SENT']
+        )
+        
+        debts = Debt.objects.filter(
+            status='PENDING',
+            deadline=deadline
+        ).exclude(
+            Exists(live_notifications)
+        ).with_balances().values(
+            'id', 'client_id', 'client__name', 'client__email',
+            'amount', 'description', 'annotated_remaining'
+        )
+        
+        reminders = [
+            cls(
+                client_id=debt['client_id'],
+                debt_id=debt['id'],
+                recipient_email=debt['client__email'],
+                vendor_email=vendor_email,
+                subject=REMINDER_SUBJECT.format(deadline=deadline_text),
+                message=REMINDER_MESSAGE.format(
+                    client_name=debt['client__name'],
+                    amount=debt['amount'],
+                    description=debt['description'],
+                    deadline=deadline_text,
+                    remaining=debt['annotated_remaining']
+                ),
+                scheduled_for=cls._reminder_schedule(deadline),
+                status='PENDING',
+                kind='REMINDER'
+            )
+            for debt in debts
+        ]
+        
+        # Reminders a concurrent run inserted meanwhile are skipped, not created
+        live_reminders = cls.objects.filter(
+            debt_id__in=[reminder.debt_id for reminder in reminders],
+            kind='REMINDER',
+            status__in=['PENDING', 'SENDING', 'SENT']
         )
+        with transaction.atomic():
+            existing = live_reminders.count()
+            cls.objects.bulk_create(reminders, ignore_conflicts=True)
+            return live_reminders.count() - existing
@@ -1,13 +1,17 @@
 from rest_framework import serializers
+from Client_Debt_Control_System.fieldsets import SparseFieldsetSerializerMixin
+from Client_Debt_Control_System.instrumentation import TimedSerializerMixin
 from .models import Notification
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Notification model."""
     
     client_name = serializers.CharField(source='client.name', read_only=True)
     debt_info = serializers.SerializerMethodField()
     
+    sparse_dependencies = {'debt_info': ['debt']}
+    
     class Meta:
         model = Notification
         fields = [
@@ -30,7 +34,7 @@ class NotificationSerializer(serializers.ModelSerializer):
         return None
 
 
-class NotificationCreateSerializer(serializers.ModelSerializer):
+class NotificationCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Simplified serializer for creating notifications."""
     
     class Meta:
@@ -1,3 +1,215 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from clients.models import Client
+from debts.models import Debt
+from .dispatch import claim_due_notifications, dispatch_due_notifications, release_stale_claims
+from .models import Notification
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class NotificationSparseFieldsetTests(APITestCase):
+    """Tests for ?fields= / ?exclude= on the notification list."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        Notification.objects.create(
+            client=self.user, recipient_email=self.user.email, subject='Reminder',
+            message='A long message body', scheduled_for=timezone.now()
+        )
+
+    def get(self, query):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('notification:notification-list') + query)
+        self.assertEqual(response.status_code, 200)
+        page_query = context.captured_queries[-1]['sql']
+        return response.data['results'][0], page_query
+
+    def test_excluded_message_is_not_fetched(self):
+        row, sql = self.get('?exclude=message,debt_info')
+
+        self.assertNotIn('message', row)
+        self.assertNotIn('debt_info', row)
+        self.assertEqual(row['subject'], 'Reminder')
+        self.assertNotIn('"notifications"."message"', sql)
+        self.assertNotIn('"debts"', sql)
+
+    def test_fields_keeps_only_the_listed_fields(self):
+        row, sql = self.get('?fields=id,subject,client_name')
+
+        self.assertEqual(set(row), {'id', 'subject', 'client_name'})
+        self.assertEqual(row['client_name'], 'Staff')
+        self.assertNotIn('"notifications"."message"', sql)
+
+
+class CreateDebtRemindersTests(TestCase):
+    """Tests for Notification.create_debt_reminders()."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='client@example.com', name='Client', phone='555-0101'
+        )
+        deadline = timezone.now().date() + timedelta(days=2)
+        self.debts = [
+            Debt.objects.create(client=self.user, amount=Decimal('50.00'), description='Due soon', deadline=deadline)
+            for _ in range(3)
+        ]
+
+    def test_counts_only_the_reminders_it_inserted(self):
+        schedule = Notification._reminder_schedule
+
+        def racing_schedule(deadline):
+            # Another run reminds the first debt after our SELECT, before our INSERT
+            if not Notification.objects.filter(debt=self.debts[0]).exists():
+                Notification.objects.create(
+                    client=self.user, debt=self.debts[0], recipient_email=self.user.email,
+                    subject='Reminder', message='Due soon', scheduled_for=timezone.now(), kind='REMINDER'
+                )
+            return schedule(deadline)
+
+        with mock.patch.object(Notification, '_reminder_schedule', side_effect=racing_schedule):
+            created = Notification.create_debt_reminders()
+
+        self.assertEqual(created, 2)
+        self.assertEqual(Notification.objects.filter(kind='REMINDER').count(), 3)
+        self.assertEqual(Notification.create_debt_reminders(), 0)
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class SendNotificationTests(APITestCase):
+    """Tests for sending a single notification."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='client@example.com', name='Client', phone='555-0101', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.debt = Debt.objects.create(
+            client=self.user, amount=Decimal('50.00'), description='Due soon',
+            deadline=timezone.now().date() + timedelta(days=2)
+        )
+
+    def send(self, notification):
+        return self.client.post(reverse('notification:notification-send', args=[notification.pk]))
+
+    def test_failed_reminder_with_a_replacement_is_not_resent(self):
+        Notification.create_debt_reminders()
+        failed = Notification.objects.get()
+        failed.status = 'FAILED'
+        failed.save()
+        self.assertEqual(Notification.create_debt_reminders(), 1)
+
+        response = self.send(failed)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('replaced', response.data['error'])
+        self.assertEqual(len(mail.outbox), 0)
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, 'FAILED')
+
+    def test_failed_reminder_without_a_replacement_is_resent(self):
+        Notification.create_debt_reminders()
+        failed = Notification.objects.get()
+        failed.status = 'FAILED'
+        failed.save()
+
+        response = self.send(failed)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'SENT')
+        self.assertEqual(len(mail.outbox), 1)
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class DispatchTests(APITestCase):
+    """Tests for the batched dispatch worker."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='client@example.com', name='Client', phone='555-0101', password='secret'
+        )
+        due = timezone.now() - timedelta(minutes=1)
+        self.notifications = [
+            Notification.objects.create(
+                client=self.user, recipient_email=self.user.email, subject=f'Notice {index}',
+                message='Hello', scheduled_for=due
+            )
+            for index in range(5)
+        ]
+        Notification.objects.create(
+            client=self.user, recipient_email=self.user.email, subject='Later',
+            message='Hello', scheduled_for=timezone.now() + timedelta(days=1)
+        )
+
+    def test_concurrent_claims_never_return_the_same_row(self):
+        new_token = uuid.uuid4
+        competing = []
+
+        def racing_token():
+            # Another worker claims after our SELECT, before our UPDATE
+            token.side_effect = new_token
+            competing.extend(claim_due_notifications(batch_size=2))
+            return new_token()
+
+        with mock.patch('notifications.dispatch.uuid.uuid4', side_effect=racing_token) as token:
+            claimed = claim_due_notifications(batch_size=3)
+        rest = claim_due_notifications(batch_size=10)
+
+        ids = [notification.pk for notification in competing + claimed + rest]
+        self.assertEqual((len(competing), len(claimed), len(rest)), (2, 1, 2))
+        self.assertEqual(sorted(ids), [notification.pk for notification in self.notifications])
+        self.assertEqual(claim_due_notifications(), [])
+
+    def test_results_are_recorded_in_one_update(self):
+        build_message = Notification.build_message
+
+        def failing_build(notification, connection=None):
+            if notification.subject == 'Notice 0':
+                raise ValueError('Mailbox unavailable')
+            return build_message(notification, connection)
+
+        with mock.patch.object(Notification, 'build_message', autospec=True, side_effect=failing_build):
+            self.assertEqual(dispatch_due_notifications(batch_size=2, workers=2), (4, 1))
+
+        self.assertEqual(sorted(message.subject for message in mail.outbox), [f'Notice {i}' for i in range(1, 5)])
+        self.assertEqual(
+            dict(Notification.objects.values_list('subject', 'status')),
+            {'Notice 0': 'FAILED', 'Notice 1': 'SENT', 'Notice 2': 'SENT',
+             'Notice 3': 'SENT', 'Notice 4': 'SENT', 'Later': 'PENDING'}
+        )
+        self.assertEqual(Notification.objects.get(subject='Notice 0').error_message, 'Mailbox unavailable')
+        self.assertFalse(Notification.objects.filter(status='SENT', sent_at__isnull=True).exists())
+
+    def test_stale_claims_are_released(self):
+        stale, fresh = claim_due_notifications(batch_size=2)
+        Notification.objects.filter(pk=stale.pk).update(claimed_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(release_stale_claims(timedelta(minutes=15)), 1)
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((stale.status, stale.claimed_by), ('PENDING', None))
+        self.assertEqual(fresh.status, 'SENDING')
+
+    def test_send_pending_only_reports_the_due_notifications(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(reverse('notification:notification-send-pending'))
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['due'], 5)
+        self.assertIn('dispatch_notifications', response.data['message'])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Notification.objects.filter(status='PENDING').count(), 6)
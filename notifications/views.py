@@ -5,6 +5,11 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
+from Client_Debt_Control_System.conditional import ConditionalGetMixin
+from Client_Debt_Control_System.fieldsets import SparseFieldsetMixin
+from Client_Debt_Control_System.exports import ExportMixin
+from clients.models import Client
+from debts.models import Debt
 from .models import Notification
 from .serializers import (
     NotificationSerializer,
@@ -20,7 +25,13 @@ def notifications_list_view(request):
     return render(request, 'notifications_list.html')
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+NOTIFICATION_EXPORT_FIELDS = [
+    'id', 'client_id', 'debt_id', 'kind', 'recipient_email', 'vendor_email',
+    'subject', 'scheduled_for', 'sent_at', 'status', 'error_message', 'created_at'
+]
+
+
+class NotificationViewSet(ExportMixin, SparseFieldsetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Notification model.
     Provides CRUD operations and custom actions.
@@ -28,6 +39,11 @@ class NotificationViewSet(viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    export_fields = NOTIFICATION_EXPORT_FIELDS
+    export_name = 'notifications'
+    conditional_related_models = [Client, Debt]
+    replica_actions = ['list', 'retrieve', 'export', 'pending']
+    sparse_fieldset_actions = ['list', 'retrieve', 'pending']
     
     def get_queryset(self):
         """Filter notifications based on query parameters."""
@@ -43,7 +59,12 @@ class NotificationViewSet(viewsets.ModelViewSet):
         if status_param:
             queryset = queryset.filter(status=status_param.upper())
         
-        return queryset.select_related('client', 'debt')
+        # Only join the clients and debts of fields that show them
+        if self.wants_fields('client_name'):
+            queryset = queryset.select_related('client')
+        if self.wants_fields('debt_info'):
+            queryset = queryset.select_related('debt')
+        return self.sparse_queryset(queryset)
     
     def get_serializer_class(self):
         """Use create serializer for create action."""
@@ -62,62 +83,53 @@ class NotificationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        if notification.status == 'SENDING':
+            return Response(
+                {'error': 'This notification is already being sent'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Sending would duplicate the replacement's email, then fail the live-reminder constraint
+        if notification.is_superseded():
+            return Response(
+                {'error': 'This reminder has been replaced by a newer one for the same debt'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         notification.send_email()
         serializer = self.get_serializer(notification)
         return Response(serializer.data)
     
     @action(detail=False, methods=['post'])
     def send_pending(self, request):
-        """Send all pending notifications that are due."""
-        now = timezone.now()
-        pending_notifications = Notification.objects.filter(
+        """
+        Report how many pending notifications are due. Nothing is sent here:
+        due notifications are already waiting for the dispatch_notifications
+        worker, which must be running (e.g. with --loop, or from cron) to
+        send them.
+        """
+        due_count = Notification.objects.filter(
             status='PENDING',
-            scheduled_for__lte=now
-        )
-        
-        sent_count = 0
-        failed_count = 0
-        
-        for notification in pending_notifications:
-            notification.send_email()
-            if notification.status == 'SENT':
-                sent_count += 1
-            else:
-                failed_count += 1
+            scheduled_for__lte=timezone.now()
+        ).count()
         
         return Response({
-            'message': f'Processed {sent_count + failed_count} notifications',
-            'sent': sent_count,
-            'failed': failed_count
-        })
+            'message': f'{due_count} notification(s) are due and will be sent by the dispatch_notifications worker',
+            'due': due_count
+        }, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get all pending notifications."""
-        pending = Notification.objects.filter(status='PENDING')
-        serializer = self.get_serializer(pending, many=True)
-        return Response(serializer.data)
+        pending = self.get_queryset().filter(status='PENDING')
+        page = self.paginate_queryset(pending)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['post'])
     def create_reminders(self, request):
         """Create reminders for debts due in 2 days."""
-        from debts.models import Debt
-        
-        created_count = 0
-        debts_needing_reminders = Debt.objects.filter(status='PENDING')
-        
-        for debt in debts_needing_reminders:
-            if debt.should_send_reminder():
-                # Check if reminder already exists
-                existing = Notification.objects.filter(
-                    debt=debt,
-                    status__in=['PENDING', 'SENT']
-                ).exists()
-                
-                if not existing:
-                    vendor_email = request.data.get('vendor_email')
-                    Notification.create_debt_reminder(debt, vendor_email)
-                    created_count += 1
+        created_count = Notification.create_debt_reminders(request.data.get('vendor_email'))
         
         return Response({
             'message': f'Created {created_count} reminder(s)',
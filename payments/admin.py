@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Payment
+from .models import Payment, PaymentDailyRollup
 
 
 @admin.register(Payment)
@@ -22,3 +22,24 @@ class PaymentAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ['created_at']
+    
+    def get_actions(self, request):
+        # Bulk deletes skip Payment.delete(), which reverses the payment on its debt
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+
+@admin.register(PaymentDailyRollup)
+class PaymentDailyRollupAdmin(admin.ModelAdmin):
+    """Read-only admin interface for the daily payment rollups."""
+    
+    list_display = ['date', 'payment_count', 'total_amount', 'client_count', 'updated_at']
+    ordering = ['-date']
+    date_hierarchy = 'date'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
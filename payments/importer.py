@@ -0,0 +1,103 @@
+"""
+Bulk payment import.
+
+Rows are validated and inserted in chunks: each chunk locks and loads its
+debts in one query, checks every row against the running remaining
+balance, inserts the payments with bulk_create and writes each affected
+debt, client summary and daily rollup once.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from Client_Debt_Control_System.uploads import add_import_error, import_rows, validate_rows
+from clients.models import ClientBalanceSummary
+from debts.models import Debt
+from .models import Payment, PaymentDailyRollup
+from .serializers import PaymentImportRowSerializer
+from .signals import payments_imported
+
+
+def import_payments(rows, chunk_size=1000):
+    """
+    Import payments from an iterable of (line_number, row, parse_error).
+    Each chunk is committed on its own. Returns the import report (see
+    import_rows).
+    """
+    return import_rows(rows, _import_chunk, payments_imported, Payment, chunk_size)
+
+
+def _import_chunk(chunk, report):
+    """Validate and insert one chunk of rows; returns the number of payments created."""
+    valid_rows = validate_rows(chunk, PaymentImportRowSerializer, report)
+    if not valid_rows:
+        return 0
+
+    today = timezone.now().date()
+
+    with transaction.atomic():
+        debts = Debt.objects.select_for_update().in_bulk({data['debt'] for _, data in valid_rows})
+        original_status = {pk: debt.status for pk, debt in debts.items()}
+
+        payments = []
+        for line_number, data in valid_rows:
+            debt = debts.get(data['debt'])
+            if debt is None:
+                add_import_error(report, line_number, {'debt': ['Debt not found.']})
+                continue
+
+            # Check against the balance left after earlier rows of this import
+            remaining = debt.amount - debt.amount_paid
+            if data['amount'] > remaining:
+                add_import_error(report, line_number, {'non_field_errors': [
+                    f"Payment amount (${data['amount']}) exceeds remaining debt balance (${remaining})."
+                ]})
+                continue
+
+            debt.amount_paid += data['amount']
+            payments.append(Payment(
+                client_id=debt.client_id,
+                debt=debt,
+                amount=data['amount'],
+                date=data.get('date') or today,
+                reference_number=data.get('reference_number'),
+                notes=data.get('notes')
+            ))
+
+        if not payments:
+            return 0
+
+        Payment.objects.bulk_create(payments)
+        PaymentDailyRollup.rebuild(dates={payment.date for payment in payments})
+
+        # Write each affected debt once, with its status recomputed
+        now = timezone.now()
+        affected = {payment.debt_id: debts[payment.debt_id] for payment in payments}
+        for debt in affected.values():
+            debt.remaining_balance = debt.amount - debt.amount_paid
+            if debt.remaining_balance <= 0:
+                debt.status = 'PAID'
+            debt.updated_at = now
+        Debt.objects.bulk_update(
+            affected.values(),
+            ['amount_paid', 'remaining_balance', 'status', 'updated_at']
+        )
+
+        # Apply one summary delta per client
+        client_deltas = defaultdict(lambda: {'paid': 0, 'active': 0, 'overdue': 0, 'payment_date': None})
+        for payment in payments:
+            delta = client_deltas[payment.client_id]
+            delta['paid'] += payment.amount
+            if delta['payment_date'] is None or payment.date > delta['payment_date']:
+                delta['payment_date'] = payment.date
+        for debt_id, debt in affected.items():
+            if debt.status != original_status[debt_id]:
+                previous_active, previous_overdue = Debt.status_counts(original_status[debt_id])
+                active, overdue = Debt.status_counts(debt.status)
+                client_deltas[debt.client_id]['active'] += active - previous_active
+                client_deltas[debt.client_id]['overdue'] += overdue - previous_overdue
+        for client_id, delta in client_deltas.items():
+            ClientBalanceSummary.apply_delta(client_id, **delta)
+
+    return len(payments)
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from payments.models import PaymentDailyRollup
+
+
+class Command(BaseCommand):
+    """Backfill or repair the PaymentDailyRollup table."""
+
+    help = 'Recompute daily payment rollups from the payments table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from',
+            dest='date_from',
+            type=date.fromisoformat,
+            help='First day to rebuild (YYYY-MM-DD); defaults to the first payment.'
+        )
+        parser.add_argument(
+            '--to',
+            dest='date_to',
+            type=date.fromisoformat,
+            help='Last day to rebuild (YYYY-MM-DD); defaults to the last payment.'
+        )
+
+    def handle(self, *args, **options):
+        days = PaymentDailyRollup.rebuild(
+            date_from=options['date_from'],
+            date_to=options['date_to']
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rollups for {days} day(s) with payments.'))
@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-17 23:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def delete_orphan_payments(apps, schema_editor):
+    # Payments now cascade with their debt; those left behind by SET_NULL go the same way
+    Payment = apps.get_model('payments', 'Payment')
+    Payment.objects.filter(debt__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('debts', '0002_sync_with_models'),
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='payment',
+            options={'ordering': ['-date', '-created_at'], 'verbose_name': 'Payment', 'verbose_name_plural': 'Payments'},
+        ),
+        migrations.AlterModelTable(
+            name='payment',
+            table='payments',
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='notes',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='reference_number',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(delete_orphan_payments, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='payment',
+            name='debt',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='debts.debt'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-17 19:05
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    PaymentDailyRollup = apps.get_model('payments', 'PaymentDailyRollup')
+    now = timezone.now()
+    PaymentDailyRollup.objects.bulk_create(
+        [
+            PaymentDailyRollup(updated_at=now, **day)
+            for day in Payment.objects.order_by().values('date').annotate(
+                payment_count=Count('id'),
+                total_amount=Sum('amount'),
+                client_count=Count('client', distinct=True)
+            )
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_payment_updated_at_payment_payments_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentDailyRollup',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('client_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Payment Daily Rollup',
+                'verbose_name_plural': 'Payment Daily Rollups',
+                'db_table': 'payment_daily_rollups',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
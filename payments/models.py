@@ -1,7 +1,11 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Count, Sum
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from decimal import Decimal
+from debts.models import Debt
+from clients.models import ClientBalanceSummary
 
 
 class Payment(models.Model):
@@ -23,10 +27,20 @@ class Payment(models.Model):
     reference_number = models.CharField(max_length=100, blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'payments'
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Keyset pagination over Meta.ordering + id
+            models.Index(fields=['-date', '-created_at', '-id'], name='payments_date_created_id_idx'),
+            # Payments of a debt or a client by date
+            models.Index(fields=['debt', 'date'], name='payments_debt_date_idx'),
+            models.Index(fields=['client', 'date'], name='payments_client_date_idx'),
+            # Latest change, for the ETag validators
+            models.Index(fields=['updated_at'], name='payments_updated_idx'),
+        ]
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
     
@@ -49,12 +63,164 @@ class Payment(models.Model):
     def save(self, *args, **kwargs):
         """Override save to validate and update debt status."""
         # Ensure client matches debt's client
-        if self.debt and self.client != self.debt.client:
+        if self.debt and self.client_id != self.debt.client_id:
             raise ValidationError('Payment client must match debt client.')
         
         self.full_clean()
-        super().save(*args, **kwargs)
         
-        # Update debt status after payment
-        if self.debt:
-            self.debt.save()
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Payment.objects.filter(pk=self.pk).values(
+                    'client_id', 'debt_id', 'amount', 'date'
+                ).first()
+            
+            super().save(*args, **kwargs)
+            self._update_daily_rollup(previous)
+            
+            # Update the debt's stored balance and status and the client summary
+            if previous and previous['debt_id'] == self.debt_id:
+                delta = self.amount - previous['amount']
+                if delta:
+                    self.debt.apply_payment(delta)
+                ClientBalanceSummary.apply_delta(
+                    self.client_id,
+                    paid=delta,
+                    refresh_last_payment=previous['date'] != self.date
+                )
+                return
+            
+            if previous:
+                Debt.objects.get(pk=previous['debt_id']).apply_payment(-previous['amount'])
+                ClientBalanceSummary.apply_delta(
+                    previous['client_id'],
+                    paid=-previous['amount'],
+                    refresh_last_payment=True
+                )
+            
+            self.debt.apply_payment(self.amount)
+            ClientBalanceSummary.apply_delta(self.client_id, paid=self.amount, payment_date=self.date)
+    
+    def delete(self, *args, **kwargs):
+        """Override delete to reverse the payment on its debt."""
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            PaymentDailyRollup.apply_delta(
+                self.date,
+                count=-1,
+                amount=-self.amount,
+                clients=-int(not self._client_paid_on(self.client_id, self.date))
+            )
+            self.debt.apply_payment(-self.amount)
+            ClientBalanceSummary.apply_delta(self.client_id, paid=-self.amount, refresh_last_payment=True)
+        return result
+    
+    def _client_paid_on(self, client_id, date):
+        """Check whether the client has another payment on that date."""
+        return Payment.objects.filter(client_id=client_id, date=date).exclude(pk=self.pk).exists()
+    
+    def _update_daily_rollup(self, previous):
+        """Apply the change from a save to the daily collection rollups."""
+        if previous and previous['date'] == self.date and previous['client_id'] == self.client_id:
+            if self.amount != previous['amount']:
+                PaymentDailyRollup.apply_delta(self.date, amount=self.amount - previous['amount'])
+            return
+        
+        if previous:
+            PaymentDailyRollup.apply_delta(
+                previous['date'],
+                count=-1,
+                amount=-previous['amount'],
+                clients=-int(not self._client_paid_on(previous['client_id'], previous['date']))
+            )
+        
+        PaymentDailyRollup.apply_delta(
+            self.date,
+            count=1,
+            amount=self.amount,
+            clients=int(not self._client_paid_on(self.client_id, self.date))
+        )
+
+
+class PaymentDailyRollup(models.Model):
+    """
+    Per-day collection totals, so time-series reports don't scan payments.
+    Maintained by Payment.save()/delete() and rebuilt with the
+    rebuild_payment_rollups command.
+    """
+    date = models.DateField(primary_key=True)
+    payment_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    # Distinct clients who paid on the day
+    client_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    ROLLUP_FIELDS = ['payment_count', 'total_amount', 'client_count']
+    
+    class Meta:
+        db_table = 'payment_daily_rollups'
+        ordering = ['date']
+        verbose_name = 'Payment Daily Rollup'
+        verbose_name_plural = 'Payment Daily Rollups'
+    
+    def __str__(self):
+        return f"{self.date}: {self.payment_count} payment(s), ${self.total_amount}"
+    
+    @classmethod
+    def apply_delta(cls, date, count=0, amount=0, clients=0):
+        """Apply incremental changes to a day's rollup with a single UPDATE."""
+        if not (count or amount or clients):
+            return
+        
+        updated = cls.objects.filter(date=date).update(
+            payment_count=F('payment_count') + count,
+            total_amount=F('total_amount') + amount,
+            client_count=F('client_count') + clients,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            # No rollup row yet: build it from the (already written) payments
+            cls.rebuild(dates=[date])
+        elif count < 0:
+            # Drop days whose last payment was removed
+            cls.objects.filter(date=date, payment_count__lte=0).delete()
+    
+    @classmethod
+    def rebuild(cls, dates=None, date_from=None, date_to=None):
+        """
+        Recompute the rollups of the given days (or date range, or every
+        day) from the payments table. Returns the number of days written.
+        """
+        payments = Payment.objects.all()
+        rollups = cls.objects.all()
+        if dates is not None:
+            payments = payments.filter(date__in=dates)
+            rollups = rollups.filter(date__in=dates)
+        if date_from:
+            payments = payments.filter(date__gte=date_from)
+            rollups = rollups.filter(date__gte=date_from)
+        if date_to:
+            payments = payments.filter(date__lte=date_to)
+            rollups = rollups.filter(date__lte=date_to)
+        
+        now = timezone.now()
+        days = [
+            cls(updated_at=now, **day)
+            for day in payments.order_by().values('date').annotate(
+                payment_count=Count('id'),
+                total_amount=Sum('amount'),
+                client_count=Count('client', distinct=True)
+            )
+        ]
+        
+        with transaction.atomic():
+            # Days whose payments are all gone
+            rollups.exclude(date__in=[day.date for day in days]).delete()
+            cls.objects.bulk_create(
+                days,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['date'],
+                update_fields=cls.ROLLUP_FIELDS + ['updated_at']
+            )
+        return len(days)
@@ -1,9 +1,15 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from Client_Debt_Control_System.fieldsets import SparseFieldsetSerializerMixin
+from Client_Debt_Control_System.instrumentation import TimedSerializerMixin
+from debts.models import Debt
 from .models import Payment
+from .services import post_payment
 from django.utils import timezone
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsetSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Payment model."""
     
     client_name = serializers.CharField(source='client.name', read_only=True)
@@ -58,8 +64,14 @@ class PaymentSerializer(serializers.ModelSerializer):
         return payment
 
 
-class PaymentCreateSerializer(serializers.ModelSerializer):
-    """Simplified serializer for creating payments."""
+class PaymentCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Simplified serializer for creating payments. The balance check is done
+    by post_payment() while the debt is locked, not during validation.
+    """
+    
+    # Only check that the debt exists; post_payment() reads its balance
+    debt = serializers.PrimaryKeyRelatedField(queryset=Debt.objects.only('id'))
     
     class Meta:
         model = Payment
@@ -71,22 +83,28 @@ class PaymentCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Payment amount must be greater than zero.")
         return value
     
-    def validate(self, data):
-        """Validate payment data."""
-        debt = data.get('debt')
-        amount = data.get('amount')
-        
-        if debt and amount:
-            remaining = debt.get_remaining_balance()
-            if amount > remaining:
-                raise serializers.ValidationError(
-                    f"Payment amount (${amount}) exceeds remaining debt balance (${remaining})."
-                )
-        
-        return data
-    
     def create(self, validated_data):
-        """Create payment with auto-assigned client."""
-        debt = validated_data['debt']
-        validated_data['client'] = debt.client
-        return super().create(validated_data)
+        """Post the payment against its debt, assigning the debt's client."""
+        try:
+            return post_payment(**validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: e.messages})
+
+
+class PaymentImportRowSerializer(serializers.Serializer):
+    """
+    Field validation for one row of a bulk payment import.
+    Debt lookups and balance checks are done per chunk by the importer.
+    """
+    
+    debt = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    date = serializers.DateField(required=False)
+    reference_number = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    
+    def validate_amount(self, value):
+        """Validate payment amount is positive."""
+        if value <= 0:
+            raise serializers.ValidationError("Payment amount must be greater than zero.")
+        return value
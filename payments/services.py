@@ -0,0 +1,89 @@
+"""
+Single payment posting.
+
+post_payment() validates, inserts and applies one payment in a single
+transaction. The debt row is locked and its balance read once; the payment,
+the debt's stored balance and status, the client summary and the daily
+rollup are all written from that read, so two concurrent payments can no
+longer both pass the balance check and overpay a debt.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from clients.models import ClientBalanceSummary
+from debts.models import Debt
+from .models import Payment, PaymentDailyRollup
+from .signals import payment_posted
+
+
+def post_payment(debt, amount, date=None, reference_number=None, notes=None):
+    """
+    Post a payment of ``amount`` towards ``debt`` (a Debt or its pk) and
+    return it. Field values are expected to be validated already (see
+    PaymentCreateSerializer); raises ValidationError when the amount is not
+    positive, the debt is gone or the amount exceeds its remaining balance.
+    """
+    if amount <= 0:
+        raise ValidationError('Payment amount must be greater than zero.')
+    debt_id = getattr(debt, 'pk', debt)
+    date = date or timezone.now().date()
+
+    with transaction.atomic():
+        try:
+            debt = Debt.objects.select_for_update(of=('self',)).select_related('client').get(pk=debt_id)
+        except Debt.DoesNotExist:
+            raise ValidationError('Debt not found.')
+
+        remaining = debt.amount - debt.amount_paid
+        if amount > remaining:
+            raise ValidationError(
+                f'Payment amount (${amount}) exceeds remaining debt balance (${remaining}).'
+            )
+
+        # Payment.save() would validate and read the balance again
+        payment = Payment(
+            client=debt.client,
+            debt=debt,
+            amount=amount,
+            date=date,
+            reference_number=reference_number,
+            notes=notes
+        )
+        Payment.objects.bulk_create([payment])
+
+        previous_status = debt.status
+        debt.amount_paid += amount
+        debt.remaining_balance = debt.amount - debt.amount_paid
+        if debt.remaining_balance <= 0:
+            debt.status = 'PAID'
+        debt.updated_at = timezone.now()
+        Debt.objects.filter(pk=debt.pk).update(
+            amount_paid=Round(F('amount_paid') + amount, 2),
+            remaining_balance=Round(F('remaining_balance') - amount, 2),
+            status=debt.status,
+            updated_at=debt.updated_at
+        )
+
+        # Updating the summary locks the client's row, so the check below
+        # sees any payment a concurrent transaction made for the same client
+        previous_active, previous_overdue = Debt.status_counts(previous_status)
+        active, overdue = Debt.status_counts(debt.status)
+        ClientBalanceSummary.apply_delta(
+            debt.client_id,
+            paid=amount,
+            active=active - previous_active,
+            overdue=overdue - previous_overdue,
+            payment_date=date
+        )
+        PaymentDailyRollup.apply_delta(
+            date,
+            count=1,
+            amount=amount,
+            clients=int(not payment._client_paid_on(debt.client_id, date))
+        )
+
+    payment_posted.send(sender=Payment, payment=payment)
+    return payment
@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+
+# Sent after a bulk import inserts payments with bulk_create, which
+# bypasses the model save signals. Provides ``count``.
+payments_imported = Signal()
+
+# Sent after payments.services.post_payment() inserts a payment, which
+# also bypasses the model save signals. Provides ``payment``.
+payment_posted = Signal()
@@ -1,3 +1,202 @@
-from django.test import TestCase
+from decimal import Decimal
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from clients.models import Client, ClientBalanceSummary
+from debts.models import Debt
+from .importer import import_payments
+from .models import Payment, PaymentDailyRollup
+from .services import post_payment
+
+
+class PaymentDailyRollupTests(TestCase):
+    """The incrementally maintained rollups match a rebuild from payments."""
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.yesterday = self.today - timedelta(days=1)
+        self.clients = [
+            Client.objects.create_user(email=f'client{i}@example.com', name=f'Client {i}', phone='555-0101')
+            for i in range(2)
+        ]
+        self.debts = [
+            Debt.objects.create(
+                client=client, amount=Decimal('1000.00'), description='Loan',
+                deadline=self.today + timedelta(days=30)
+            )
+            for client in self.clients
+        ]
+
+    def pay(self, index, amount, date):
+        payment = Payment(client=self.clients[index], debt=self.debts[index], amount=Decimal(amount), date=date)
+        payment.save()
+        return payment
+
+    def snapshot(self):
+        return list(PaymentDailyRollup.objects.values('date', *PaymentDailyRollup.ROLLUP_FIELDS))
+
+    def assertRollupsMatchRebuild(self):
+        maintained = self.snapshot()
+        PaymentDailyRollup.rebuild()
+        self.assertEqual(maintained, self.snapshot())
+
+    def test_writes_keep_rollups_in_sync(self):
+        first = self.pay(0, '10.00', self.today)
+        self.pay(0, '20.00', self.today)
+        self.pay(1, '30.00', self.today)
+        moved = self.pay(1, '40.00', self.yesterday)
+
+        today = PaymentDailyRollup.objects.get(date=self.today)
+        self.assertEqual((today.payment_count, today.total_amount, today.client_count), (3, Decimal('60.00'), 2))
+        self.assertRollupsMatchRebuild()
+
+        first.amount = Decimal('15.00')
+        first.save()
+        moved.date = self.today
+        moved.save()
+        self.assertRollupsMatchRebuild()
+
+        first.delete()
+        self.assertRollupsMatchRebuild()
+
+        self.debts[1].delete()
+        self.assertRollupsMatchRebuild()
+        self.assertFalse(PaymentDailyRollup.objects.filter(date=self.yesterday).exists())
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class PostPaymentTests(APITestCase):
+    """Tests for the single-pass payment posting service."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='client@example.com', name='Client', phone='555-0101', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.debt = Debt.objects.create(
+            client=self.user, amount=Decimal('100.00'), description='Loan',
+            deadline=timezone.now().date() - timedelta(days=1)
+        )
+
+    def test_posting_updates_debt_summary_and_rollup(self):
+        post_payment(self.debt.pk, Decimal('40.00'))
+        # One locked read, then one write per table (plus the savepoint)
+        with self.assertNumQueries(8):
+            post_payment(self.debt, Decimal('60.00'))
+
+        self.debt.refresh_from_db()
+        self.assertEqual(self.debt.amount_paid, Decimal('100.00'))
+        self.assertEqual(self.debt.remaining_balance, Decimal('0.00'))
+        self.assertEqual(self.debt.status, 'PAID')
+        self.assertEqual(ClientBalanceSummary.reconcile(dry_run=True), 0)
+
+        rollup = PaymentDailyRollup.objects.get(date=timezone.now().date())
+        self.assertEqual((rollup.payment_count, rollup.total_amount, rollup.client_count), (2, Decimal('100.00'), 1))
+
+    def test_overpayment_is_rejected_without_writing(self):
+        post_payment(self.debt.pk, Decimal('70.00'))
+
+        with self.assertRaises(ValidationError):
+            post_payment(self.debt.pk, Decimal('30.01'))
+
+        self.assertEqual(Payment.objects.count(), 1)
+        self.debt.refresh_from_db()
+        self.assertEqual(self.debt.remaining_balance, Decimal('30.00'))
+
+    def test_api_reports_overpayment_as_a_validation_error(self):
+        url = reverse('payment:payment-list')
+
+        response = self.client.post(url, {'debt': self.debt.pk, 'amount': '150.00'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exceeds remaining debt balance', response.data['non_field_errors'][0])
+
+        response = self.client.post(url, {'debt': self.debt.pk, 'amount': '25.00'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['client'], self.user.pk)
+        self.assertEqual(response.data['client_name'], 'Client')
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class PaymentImportTests(APITestCase):
+    """Tests for the bulk payment import."""
+
+    def setUp(self):
+        self.user = Client.objects.create_user(
+            email='client@example.com', name='Client', phone='555-0101', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.debt = Debt.objects.create(
+            client=self.user, amount=Decimal('100.00'), description='Loan',
+            deadline=timezone.now().date() + timedelta(days=30)
+        )
+        self.url = reverse('payment:payment-import-payments')
+
+    def upload(self, name, content):
+        return self.client.post(self.url, {'file': SimpleUploadedFile(name, content)}, format='multipart')
+
+    def test_imports_a_csv_file(self):
+        response = self.upload('payments.csv', (
+            'debt,amount,date,reference_number\n'
+            f'{self.debt.pk},30.00,2026-01-05,A-1\n'
+            f'{self.debt.pk},70.00,,\n'
+        ).encode())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'created': 2, 'failed': 0, 'errors': []})
+        self.debt.refresh_from_db()
+        self.assertEqual(self.debt.status, 'PAID')
+        self.assertEqual(ClientBalanceSummary.reconcile(dry_run=True), 0)
+
+    def test_reports_the_rows_that_fail(self):
+        response = self.upload('payments.jsonl', (
+            f'{{"debt": {self.debt.pk}, "amount": "60.00"}}\n'
+            f'{{"debt": {self.debt.pk}, "amount": "50.00"}}\n'
+            '{"debt": 999999, "amount": "1.00"}\n'
+            'not json\n'
+            f'{{"debt": {self.debt.pk}, "amount": "-5"}}\n'
+        ).encode())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 4))
+        errors = {error['line']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5])
+        self.assertIn('exceeds remaining debt balance', errors[2]['non_field_errors'][0])
+        self.assertEqual(errors[3], {'debt': ['Debt not found.']})
+        self.assertIn('amount', errors[5])
+
+    def test_reports_lines_that_are_not_utf8(self):
+        response = self.upload('payments.csv', (
+            b'debt,amount\n'
+            + f'{self.debt.pk},10.00\n'.encode()
+            + b'\xff\xfe,20.00\n'
+            + f'{self.debt.pk},5.00\n'.encode()
+        ))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 1))
+        self.assertEqual(response.data['errors'][0]['line'], 3)
+        self.assertIn('Invalid UTF-8', response.data['errors'][0]['errors']['non_field_errors'][0])
+
+    def test_unreadable_header_fails_the_file(self):
+        response = self.upload('payments.csv', b'de\xffbt,amount\n1,10.00\n')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (0, 1))
+        self.assertIn('Invalid CSV header', response.data['errors'][0]['errors']['non_field_errors'][0])
+
+    def test_balance_carries_across_chunks(self):
+        rows = [(line, {'debt': str(self.debt.pk), 'amount': '40.00'}, None) for line in range(2, 6)]
+
+        report = import_payments(iter(rows), chunk_size=2)
+
+        self.assertEqual((report['created'], report['failed']), (2, 2))
+        self.assertEqual([error['line'] for error in report['errors']], [4, 5])
+        self.debt.refresh_from_db()
+        self.assertEqual(self.debt.amount_paid, Decimal('80.00'))
+        self.assertEqual(Payment.objects.count(), 2)
@@ -4,11 +4,25 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from Client_Debt_Control_System.conditional import ConditionalGetMixin
+from Client_Debt_Control_System.fieldsets import SparseFieldsetMixin
+from Client_Debt_Control_System.uploads import UPLOAD_FORMATS, get_upload_format, iter_upload_rows
+from Client_Debt_Control_System.exports import ExportMixin
+from clients.models import Client
+from debts.models import Debt
 from .models import Payment
+from .importer import import_payments
 from .serializers import PaymentSerializer, PaymentCreateSerializer
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+PAYMENT_EXPORT_FIELDS = [
+    'id', 'client_id', 'client__email', 'debt_id',
+    'amount', 'date', 'reference_number', 'notes', 'created_at'
+]
+
+
+class PaymentViewSet(ExportMixin, SparseFieldsetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Payment model.
     Provides CRUD operations and custom actions.
@@ -16,6 +30,11 @@ class PaymentViewSet(viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    export_fields = PAYMENT_EXPORT_FIELDS
+    export_name = 'payments'
+    conditional_related_models = [Client, Debt]
+    replica_actions = ['list', 'retrieve', 'export', 'recent', 'summary']
+    sparse_fieldset_actions = ['list', 'retrieve', 'recent']
     
     def get_queryset(self):
         """Filter payments based on query parameters."""
@@ -31,7 +50,12 @@ class PaymentViewSet(viewsets.ModelViewSet):
         if debt_id:
             queryset = queryset.filter(debt_id=debt_id)
         
-        return queryset.select_related('client', 'debt')
+        # Only join the clients and debts of fields that show them
+        if self.wants_fields('client_name'):
+            queryset = queryset.select_related('client')
+        if self.wants_fields('debt_amount'):
+            queryset = queryset.select_related('debt')
+        return self.sparse_queryset(queryset)
     
     def get_serializer_class(self):
         """Use create serializer for create action."""
@@ -49,14 +73,40 @@ class PaymentViewSet(viewsets.ModelViewSet):
         response_serializer = PaymentSerializer(payment)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
     
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_payments(self, request):
+        """
+        Import payments from an uploaded CSV or JSON Lines file.
+        Columns/keys: debt, amount, date, reference_number, notes.
+        An optional "format" field (csv or jsonl) overrides the file extension.
+        Returns the number of created and failed rows and per-row errors.
+        """
+        uploaded_file = request.FILES.get('file')
+        if not uploaded_file:
+            return Response(
+                {'error': 'Upload the payments as a "file" field'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        fmt = get_upload_format(uploaded_file, request.data.get('format'))
+        if fmt not in UPLOAD_FORMATS:
+            return Response(
+                {'error': f'Unsupported format; use one of {", ".join(UPLOAD_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        report = import_payments(iter_upload_rows(uploaded_file, fmt))
+        return Response(report)
+    
     @action(detail=False, methods=['get'])
     def recent(self, request):
         """Get recent payments (last 30 days)."""
         from django.utils import timezone
         thirty_days_ago = timezone.now().date() - timezone.timedelta(days=30)
-        recent_payments = Payment.objects.filter(date__gte=thirty_days_ago)
-        serializer = self.get_serializer(recent_payments, many=True)
-        return Response(serializer.data)
+        recent_payments = self.get_queryset().filter(date__gte=thirty_days_ago)
+        page = self.paginate_queryset(recent_payments)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def summary(self, request):
@@ -0,0 +1,116 @@
+"""
+Versioned cache for report responses.
+
+Every cached report is keyed by a global ledger version. Writes to clients,
+debts and payments bump the version (see report/signals.py), which makes
+every cached report stale at once without having to know their keys; the
+old entries simply expire. Keys also carry today's date, since overdue and
+upcoming figures change at midnight without any write, and the database the
+report is read from: a report built from a lagging replica after a write
+must not be served to a client pinned to default by that write.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from Client_Debt_Control_System.routers import get_read_database
+
+
+LEDGER_VERSION_KEY = 'report:ledger_version'
+LEDGER_MODIFIED_KEY = 'report:ledger_modified'
+HITS_KEY = 'report:cache_hits'
+MISSES_KEY = 'report:cache_misses'
+
+
+def get_report_cache():
+    """Get the cache backend configured by REPORT_CACHE_ALIAS."""
+    return caches[settings.REPORT_CACHE_ALIAS]
+
+
+def get_ledger_version():
+    """Get the current ledger version, starting a new one if it was evicted."""
+    report_cache = get_report_cache()
+    version = report_cache.get(LEDGER_VERSION_KEY)
+    if version is None:
+        # Start from the clock, so a restarted counter never reuses old keys
+        report_cache.add(LEDGER_VERSION_KEY, int(time.time() * 1000), None)
+        version = report_cache.get(LEDGER_VERSION_KEY)
+    return version
+
+
+def get_ledger_modified():
+    """Get when the ledger version last changed, as an aware datetime."""
+    report_cache = get_report_cache()
+    modified = report_cache.get(LEDGER_MODIFIED_KEY)
+    if modified is None:
+        report_cache.add(LEDGER_MODIFIED_KEY, timezone.now(), None)
+        modified = report_cache.get(LEDGER_MODIFIED_KEY)
+    return modified
+
+
+def bump_ledger_version():
+    """Invalidate every cached report by moving to a new ledger version."""
+    report_cache = get_report_cache()
+    report_cache.set(LEDGER_MODIFIED_KEY, timezone.now(), None)
+    try:
+        return report_cache.incr(LEDGER_VERSION_KEY)
+    except ValueError:
+        # Not set yet (or evicted); any fresh version is newer than the cached ones
+        return get_ledger_version()
+
+
+def _increment(key):
+    report_cache = get_report_cache()
+    try:
+        report_cache.incr(key)
+    except ValueError:
+        report_cache.add(key, 0, None)
+        report_cache.incr(key)
+
+
+def report_cache_key(name, params=None):
+    """Build the cache key of report ``name`` for the current ledger version and read database."""
+    key = f'report:{name}:{get_read_database()}:v{get_ledger_version()}:{timezone.now().date().isoformat()}'
+    if params:
+        encoded = json.dumps(params, sort_keys=True, default=str).encode()
+        key += ':' + hashlib.md5(encoded).hexdigest()
+    return key
+
+
+def cached_report(name, build, params=None, refresh=False):
+    """
+    Return report ``name`` for ``params`` from the cache, computing it
+    with ``build()`` on a miss (or always, when ``refresh`` is set).
+    """
+    report_cache = get_report_cache()
+    key = report_cache_key(name, params)
+
+    if not refresh:
+        data = report_cache.get(key)
+        if data is not None:
+            _increment(HITS_KEY)
+            return data
+        _increment(MISSES_KEY)
+
+    data = build()
+    report_cache.set(key, data, settings.REPORT_CACHE_TIMEOUT)
+    return data
+
+
+def report_cache_stats():
+    """Get the ledger version and the hit/miss counters of the report cache."""
+    report_cache = get_report_cache()
+    counters = report_cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'ledger_version': get_ledger_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups * 100, 2) if lookups else 0.0
+    }
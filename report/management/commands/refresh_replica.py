@@ -0,0 +1,44 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from report.cache import bump_ledger_version
+
+
+class Command(BaseCommand):
+    """Copy the default SQLite database onto the replica with the SQLite backup API."""
+
+    help = 'Refresh the SQLite read replica from the default database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=getattr(settings, 'REPLICA_DATABASE', None) or 'replica',
+            help='Alias of the replica to refresh (default: REPLICA_DATABASE, or "replica").'
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias == DEFAULT_DB_ALIAS or alias not in settings.DATABASES:
+            raise CommandError(f'"{alias}" is not a replica database alias.')
+
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite' or connections[alias].vendor != 'sqlite':
+            raise CommandError('Only SQLite replicas can be refreshed; other backends replicate on their own.')
+
+        started = time.perf_counter()
+        source.ensure_connection()
+        # One step, so the copy is a consistent snapshot of default
+        with closing(sqlite3.connect(settings.DATABASES[alias]['NAME'])) as replica:
+            source.connection.backup(replica)
+
+        # Reports cached while the replica lagged behind are rebuilt from the fresh copy
+        bump_ledger_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed "{alias}" in {(time.perf_counter() - started) * 1000:.1f} ms.'
+        ))
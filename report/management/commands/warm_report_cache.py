@@ -0,0 +1,31 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from report.cache import cached_report
+from report.views import (
+    build_outstanding_report, build_overdue_report, build_aging_report, build_dashboard_snapshot
+)
+
+
+class Command(BaseCommand):
+    """Pre-compute the cached reports, e.g. right after a deploy."""
+
+    help = 'Compute the outstanding, overdue, aging and dashboard reports and store them in the report cache.'
+
+    def handle(self, *args, **options):
+        reports = [
+            # Same params as an unfiltered GET /api/reports/outstanding/
+            ('outstanding', build_outstanding_report, {'top': None, 'min_balance': Decimal('0')}),
+            ('overdue', build_overdue_report, None),
+            ('aging', build_aging_report, {'client': None}),
+            ('dashboard', build_dashboard_snapshot, None),
+        ]
+
+        for name, build, params in reports:
+            started = time.perf_counter()
+            cached_report(name, build, params=params, refresh=True)
+            self.stdout.write(f'{name}: {(time.perf_counter() - started) * 1000:.1f} ms')
+
+        self.stdout.write(self.style.SUCCESS(f'Warmed {len(reports)} report(s).'))
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from clients.models import Client
+from debts.models import Debt
+from debts.signals import overdue_swept, debts_imported
+from payments.models import Payment
+from payments.signals import payment_posted, payments_imported
+from .cache import bump_ledger_version
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+@receiver(post_save, sender=Debt)
+@receiver(post_delete, sender=Debt)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def invalidate_reports(sender, update_fields=None, **kwargs):
+    """Move to a new ledger version, so cached reports are recomputed."""
+    # Logins only touch last_login, which no report uses
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    bump_ledger_version()
+
+
+@receiver(overdue_swept)
+@receiver(debts_imported)
+@receiver(payments_imported)
+@receiver(payment_posted)
+def invalidate_reports_after_bulk_write(sender, **kwargs):
+    """Bulk writes (overdue sweep, imports, posted payments) bypass the save signals."""
+    bump_ledger_version()
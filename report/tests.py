@@ -1,3 +1,453 @@
-from django.test import TestCase
+import re
+from decimal import Decimal
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.db import connection, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+
+from clients.models import Client
+from debts.importer import import_debts
+from debts.models import Debt
+from debts.sweeper import sweep_overdue_debts
+from notifications.models import Notification
+from payments.importer import import_payments
+from payments.models import Payment
+from payments.services import post_payment
+from .cache import get_report_cache
+from .views import COLLECTION_GRANULARITIES
+
+
+# A table walk, whether over the table itself or over one of its indexes
+FULL_SCAN = re.compile(r'^SCAN \w+( USING (COVERING )?INDEX \w+)?$')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class QueryPlanTests(APITestCase):
+    """
+    Run EXPLAIN QUERY PLAN on every SELECT issued by the hot API paths and
+    fail when one of them falls back to a full table scan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        today = timezone.now().date()
+        for i in range(5):
+            client = Client.objects.create_user(
+                email=f'client{i}@example.com', name=f'Client {i}', phone='555-0101'
+            )
+            debt = Debt.objects.create(
+                client=client, amount=Decimal('1000.00'), description='Loan',
+                deadline=today + timedelta(days=i - 2)
+            )
+            Payment(client=client, debt=debt, amount=Decimal('10.00')).save()
+            Notification.objects.create(
+                client=client, debt=debt, recipient_email=client.email,
+                subject='Reminder', message='Please pay', scheduled_for=timezone.now()
+            )
+        cls.client_obj = client
+        cls.debt = debt
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+        # Reports served from the cache would run no queries at all
+        get_report_cache().clear()
+
+    def get_full_scans(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            details = [row[-1] for row in cursor.fetchall()]
+        return [detail for detail in details if FULL_SCAN.match(detail)]
+
+    def assertNoFullTableScan(self, url, method='get', allowed=()):
+        """
+        Request ``url`` and check the plan of every SELECT it ran.
+        ``allowed`` lists plan lines that are expected, e.g. an unfiltered
+        page walking the keyset pagination index until its LIMIT is hit, or
+        the ETag fingerprint of an unfiltered list counting every row of
+        the updated_at index.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url)
+        self.assertLess(response.status_code, 400, response.content)
+
+        for query in context.captured_queries:
+            if not query['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            scans = [scan for scan in self.get_full_scans(query['sql']) if scan not in allowed]
+            if scans:
+                self.fail(f'{url} walks a whole table ({", ".join(scans)}):\n{query["sql"]}')
+
+    def test_client_endpoints(self):
+        self.assertNoFullTableScan('/api/clients/', allowed=[
+            'SCAN clients USING INDEX clients_created_id_idx',
+            'SCAN clients USING COVERING INDEX clients_updated_idx',
+        ])
+        self.assertNoFullTableScan(f'/api/clients/{self.client_obj.pk}/')
+        self.assertNoFullTableScan(f'/api/clients/{self.client_obj.pk}/balance/')
+
+    def test_debt_endpoints(self):
+        self.assertNoFullTableScan('/api/debts/', allowed=[
+            'SCAN debts USING INDEX debts_created_id_idx',
+            'SCAN debts USING COVERING INDEX debts_updated_idx',
+        ])
+        self.assertNoFullTableScan(f'/api/debts/?client={self.client_obj.pk}')
+        self.assertNoFullTableScan('/api/debts/?status=pending')
+        self.assertNoFullTableScan('/api/debts/?overdue=true')
+        self.assertNoFullTableScan('/api/debts/overdue/')
+        self.assertNoFullTableScan('/api/debts/pending/')
+        self.assertNoFullTableScan('/api/debts/upcoming/')
+        self.assertNoFullTableScan(f'/api/debts/{self.debt.pk}/')
+
+    def test_payment_endpoints(self):
+        self.assertNoFullTableScan('/api/payments/', allowed=[
+            'SCAN payments USING INDEX payments_date_created_id_idx',
+            'SCAN payments USING COVERING INDEX payments_updated_idx',
+        ])
+        self.assertNoFullTableScan(f'/api/payments/?debt={self.debt.pk}')
+        self.assertNoFullTableScan(f'/api/payments/?client={self.client_obj.pk}')
+        self.assertNoFullTableScan('/api/payments/recent/')
+
+    def test_notification_endpoints(self):
+        self.assertNoFullTableScan('/api/notifications/', allowed=[
+            'SCAN notifications USING INDEX notif_scheduled_id_idx',
+            'SCAN notifications USING COVERING INDEX notif_updated_idx',
+        ])
+        self.assertNoFullTableScan(f'/api/notifications/?client={self.client_obj.pk}')
+        self.assertNoFullTableScan('/api/notifications/?status=pending')
+        self.assertNoFullTableScan('/api/notifications/pending/')
+        self.assertNoFullTableScan('/api/notifications/send_pending/', method='post')
+
+    def test_report_endpoints(self):
+        self.assertNoFullTableScan('/api/reports/overdue/')
+        self.assertNoFullTableScan('/api/reports/aging/')
+        self.assertNoFullTableScan(f'/api/reports/aging/?client={self.client_obj.pk}')
+        self.assertNoFullTableScan('/api/reports/collections/?granularity=week')
+        # The outstanding report totals every client, so only the client
+        # table may be walked; debts and payments must be index lookups.
+        self.assertNoFullTableScan('/api/reports/outstanding/', allowed=[
+            'SCAN clients',
+            'SCAN clients USING COVERING INDEX clients_created_id_idx',
+            'SCAN clients USING COVERING INDEX clients_updated_idx',
+        ])
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class DashboardSnapshotTests(APITestCase):
+    """The cached dashboard snapshot is rebuilt after every kind of ledger write."""
+
+    url = '/api/reports/dashboard/'
+
+    def setUp(self):
+        get_report_cache().clear()
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date()
+        self.debt = Debt.objects.create(
+            client=self.user, amount=Decimal('100.00'), description='Loan',
+            deadline=self.today + timedelta(days=3)
+        )
+        self.payment = Payment.objects.create(client=self.user, debt=self.debt, amount=Decimal('10.00'))
+
+    def edit_debt(self):
+        self.debt.amount = Decimal('150.00')
+        self.debt.save()
+
+    def sweep(self):
+        Debt.objects.filter(pk=self.debt.pk).update(deadline=self.today - timedelta(days=1))
+        sweep_overdue_debts()
+
+    def test_writes_invalidate_the_snapshot(self):
+        writes = {
+            'client': lambda: Client.objects.create_user(email='new@example.com', name='New', phone='555-0101'),
+            'debt edit': self.edit_debt,
+            'payment': lambda: Payment.objects.create(client=self.user, debt=self.debt, amount=Decimal('1.00')),
+            'payment delete': lambda: Payment.objects.get(pk=self.payment.pk).delete(),
+            'posted payment': lambda: post_payment(self.debt.pk, Decimal('2.00')),
+            'payment import': lambda: import_payments([(1, {'debt': self.debt.pk, 'amount': '3.00'}, None)]),
+            'debt import': lambda: import_debts([(1, {
+                'client': self.user.email, 'amount': '5.00', 'description': 'Fee', 'deadline': self.today
+            }, None)]),
+            'overdue sweep': self.sweep,
+        }
+        for name, write in writes.items():
+            with self.subTest(write=name):
+                before = self.client.get(self.url).data
+                with self.assertNumQueries(0):
+                    self.client.get(self.url)
+
+                write()
+                self.assertNotEqual(self.client.get(self.url).data, before)
+
+    def test_snapshot_is_rebuilt_at_midnight(self):
+        self.assertEqual(self.client.get(self.url).data['debts']['upcoming'], 1)
+
+        later = timezone.now() + timedelta(days=5)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(self.client.get(self.url).data['debts']['upcoming'], 0)
+
+    def test_logins_keep_the_snapshot(self):
+        self.client.get(self.url)
+
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class ReportCacheTests(APITestCase):
+    """The report cache is served until the ledger changes."""
+
+    def setUp(self):
+        get_report_cache().clear()
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.debt = Debt.objects.create(
+            client=self.user, amount=Decimal('100.00'), description='Loan',
+            deadline=timezone.now().date() - timedelta(days=5)
+        )
+
+    def test_reports_are_cached_until_a_write(self):
+        for url in ['/api/reports/dashboard/', '/api/reports/outstanding/', '/api/reports/overdue/']:
+            with self.subTest(url=url):
+                first = self.client.get(url).data
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(url).data, first)
+
+                Payment(client=self.user, debt=self.debt, amount=Decimal('1.00')).save()
+                self.assertNotEqual(self.client.get(url).data, first)
+
+    def test_stats_count_hits_and_misses(self):
+        self.client.get('/api/reports/dashboard/')
+        self.client.get('/api/reports/dashboard/')
+
+        stats = self.client.get('/api/reports/cache/').data
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class OutstandingReportTests(APITestCase):
+    """The outstanding report ranks clients by balance in SQL."""
+
+    def setUp(self):
+        get_report_cache().clear()
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        deadline = timezone.now().date() + timedelta(days=30)
+        for index, amount in enumerate(['10.00', '30.00', '20.00', '5.00']):
+            client = Client.objects.create_user(
+                email=f'client{index}@example.com', name=f'Client {index}', phone='555-0101'
+            )
+            Debt.objects.create(client=client, amount=Decimal(amount), description='Loan', deadline=deadline)
+
+    def balances(self, query=''):
+        response = self.client.get(f'/api/reports/outstanding/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data, [client['balance'] for client in response.data['clients']]
+
+    def test_top_keeps_the_highest_balances(self):
+        report, balances = self.balances('?top=2')
+
+        self.assertEqual(balances, [30.0, 20.0])
+        self.assertEqual(report['total_clients'], 4)
+        self.assertEqual(report['total_outstanding'], 65.0)
+
+    def test_min_balance_filters_clients(self):
+        report, balances = self.balances('?min_balance=10')
+
+        self.assertEqual(balances, [30.0, 20.0])
+        self.assertEqual(report['total_outstanding'], 50.0)
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in [
+            'top=0', 'top=-1', 'top=two', 'top=100000000000000000000', 'top=1001',
+            'min_balance=ten', 'min_balance=NaN', 'min_balance=sNaN', 'min_balance=Infinity',
+            'min_balance=-inf',
+        ]:
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/reports/outstanding/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class AgingReportTests(APITestCase):
+    """Aging buckets are computed from remaining balances."""
+
+    def setUp(self):
+        get_report_cache().clear()
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_buckets_use_remaining_balance(self):
+        today = timezone.now().date()
+        for days_past, amount in [(-5, '100.00'), (1, '10.00'), (30, '20.00'), (31, '30.00'), (90, '40.00'), (91, '50.00')]:
+            Debt.objects.create(
+                client=self.user, amount=Decimal(amount), description='Loan',
+                deadline=today - timedelta(days=days_past)
+            )
+        paid = Debt.objects.create(
+            client=self.user, amount=Decimal('70.00'), description='Paid', deadline=today
+        )
+        Payment(client=self.user, debt=paid, amount=Decimal('70.00')).save()
+        partly_paid = Debt.objects.get(amount=Decimal('100.00'))
+        Payment(client=self.user, debt=partly_paid, amount=Decimal('25.00')).save()
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/reports/aging/')
+
+        expected = {
+            'current': 75.0, '1_30': 30.0, '31_60': 30.0,
+            '61_90': 40.0, '90_plus': 50.0, 'total': 225.0
+        }
+        self.assertEqual(response.data['totals'], expected)
+        self.assertEqual(len(response.data['clients']), 1)
+        self.assertEqual(response.data['clients'][0]['90_plus'], 50.0)
+
+    def test_invalid_client_is_rejected(self):
+        for query in ['client=me', 'client=0', 'client=-1', 'client=99999999999999999999']:
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/reports/aging/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0)
+class CollectionsReportTests(APITestCase):
+    """The collections report reads the daily payment rollups."""
+
+    def setUp(self):
+        get_report_cache().clear()
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_periods_are_filled_and_summed(self):
+        today = timezone.now().date()
+        debt = Debt.objects.create(
+            client=self.user, amount=Decimal('1000.00'), description='Loan',
+            deadline=today + timedelta(days=30)
+        )
+        for days_ago, amount in [(0, '10.00'), (0, '20.00'), (2, '5.00')]:
+            Payment(client=self.user, debt=debt, amount=Decimal(amount), date=today - timedelta(days=days_ago)).save()
+
+        url = f'/api/reports/collections/?from={today - timedelta(days=3)}&to={today}'
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(period['payments'], period['amount'], period['client_days']) for period in response.data['periods']],
+            [(0, 0.0, 0), (1, 5.0, 1), (0, 0.0, 0), (2, 30.0, 1)]
+        )
+        self.assertEqual(response.data['total_amount'], 35.0)
+
+        response = self.client.get(url + '&granularity=month')
+        self.assertEqual(response.data['total_payments'], 3)
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in [
+            'from=yesterday', 'from=2026-02-30', 'from=2026-02-01&to=2026-01-01', 'granularity=year',
+            'to=garbage', 'to=0001-01-05', 'from=0001-01-01&to=9999-12-31',
+            'from=2020-01-01&to=2026-01-01', 'from=1900-01-01&to=2026-01-01&granularity=week',
+        ]:
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/reports/collections/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+    def test_ranges_ending_at_the_last_date_are_served(self):
+        for granularity in COLLECTION_GRANULARITIES:
+            with self.subTest(granularity=granularity):
+                response = self.client.get(
+                    f'/api/reports/collections/?from=9999-12-01&to=9999-12-31&granularity={granularity}'
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(str(response.data['periods'][-1]['period']), {
+                    'day': '9999-12-31', 'week': '9999-12-27', 'month': '9999-12-01'
+                }[granularity])
+
+
+@override_settings(OVERDUE_SWEEP_INTERVAL=0, REPLICA_DATABASE='replica')
+class ReplicaRoutingTests(APITransactionTestCase):
+    """
+    Tests for routing safe reads to the replica. In tests the replica is a
+    mirror of default on its own connection, which only sees committed rows.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_report_cache().clear()
+        self.user = Client.objects.create_user(
+            email='staff@example.com', name='Staff', phone='555-0100', password='secret'
+        )
+        self.client.force_authenticate(user=self.user)
+        Debt.objects.create(
+            client=self.user, amount=Decimal('100.00'), description='Debt',
+            deadline=timezone.now().date() - timedelta(days=5)
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            with CaptureQueriesContext(connections['default']) as default:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(replica), len(default)
+
+    def test_reports_and_lists_read_from_the_replica(self):
+        for url in ['/api/reports/outstanding/', '/api/reports/dashboard/', '/api/debts/']:
+            response, replica_queries, default_queries = self.get(url)
+            self.assertGreater(replica_queries, 0, url)
+            self.assertEqual(default_queries, 0, url)
+
+    def test_writes_pin_the_client_to_default(self):
+        response = self.client.post('/api/debts/', {
+            'client': self.user.pk, 'amount': '20.00', 'description': 'New',
+            'deadline': (timezone.now().date() + timedelta(days=5)).isoformat()
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('replica_pin', response.cookies)
+
+        response, replica_queries, default_queries = self.get('/api/debts/')
+        self.assertEqual(replica_queries, 0)
+        self.assertEqual(response.data['results'][0]['description'], 'New')
+
+    def test_pinned_client_does_not_get_a_report_cached_from_the_replica(self):
+        response = self.client.post('/api/debts/', {
+            'client': self.user.pk, 'amount': '20.00', 'description': 'New',
+            'deadline': (timezone.now().date() + timedelta(days=5)).isoformat()
+        })
+        self.assertEqual(response.status_code, 201)
+
+        # Another client, not pinned, builds the report from the replica
+        # under the ledger version the write just moved to
+        other = APIClient()
+        other.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connections['replica']) as replica:
+            replica_response = other.get('/api/reports/dashboard/')
+        self.assertGreater(len(replica), 0)
+
+        # The writer is pinned to default and gets a report built from it
+        response, replica_queries, default_queries = self.get('/api/reports/dashboard/')
+        self.assertEqual(replica_queries, 0)
+        self.assertGreater(default_queries, 0)
+        self.assertEqual(response.data['debts']['total_amount'], 120.0)
+        self.assertNotEqual(response['ETag'], replica_response['ETag'])
+
+        response = self.client.get('/api/reports/dashboard/', HTTP_IF_NONE_MATCH=replica_response['ETag'])
+        self.assertEqual(response.status_code, 200)
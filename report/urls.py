@@ -1,10 +1,13 @@
 from django.urls import path
-from .views import OutstandingReportView, OverdueReportView, DashboardStatsView
+from .views import OutstandingReportView, OverdueReportView, DashboardStatsView, AgingReportView, CollectionsReportView, ReportCacheStatsView
 
 app_name = 'report'
 
 urlpatterns = [
     path('outstanding/', OutstandingReportView.as_view(), name='outstanding'),
     path('overdue/', OverdueReportView.as_view(), name='overdue'),
+    path('aging/', AgingReportView.as_view(), name='aging'),
+    path('collections/', CollectionsReportView.as_view(), name='collections'),
     path('dashboard/', DashboardStatsView.as_view(), name='dashboard'),
+    path('cache/', ReportCacheStatsView.as_view(), name='cache-stats'),
 ]
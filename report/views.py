@@ -1,153 +1,478 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count, Q
+from django.db import connection
+from django.db.models import Sum, Count, Q, Case, When, F, Value, DecimalField
+from django.db.models.functions import Coalesce, TruncWeek, TruncMonth
+from django.utils.dateparse import parse_date
 from django.utils import timezone
-from client.models import Client
-from debt.models import Debt
-from payment.models import Payment
-from decimal import Decimal
+from clients.models import Client
+from debts.models import Debt
+from payments.models import PaymentDailyRollup
+from decimal import Decimal, InvalidOperation
+from functools import wraps
+from Client_Debt_Control_System.conditional import make_etag, not_modified_response, set_validators
+from Client_Debt_Control_System.routers import get_read_database
+from .cache import cached_report, report_cache_stats, get_ledger_version, get_ledger_modified
+
+
+def ledger_conditional(get):
+    """
+    Give a report view ETag / Last-Modified validators derived from the
+    ledger version and the database it reads, so an unchanged report is
+    answered with 304 without running a query.
+    """
+    @wraps(get)
+    def wrapper(self, request, *args, **kwargs):
+        etag = make_etag(
+            request.get_full_path(),
+            request.accepted_media_type,
+            get_ledger_version(),
+            get_read_database(),
+            timezone.now().date().isoformat()
+        )
+        last_modified = get_ledger_modified()
+        
+        response = not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = get(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                set_validators(response, etag, last_modified)
+        return response
+    return wrapper
+
+
+# Largest ?top= the outstanding report accepts
+OUTSTANDING_MAX_TOP = 1000
+
+
+def build_outstanding_report(top=None, min_balance=Decimal('0')):
+    """Compute the outstanding report: clients whose balance exceeds ``min_balance``."""
+    outstanding = Client.objects.with_balances().filter(balance__gt=min_balance)
+    
+    totals = outstanding.aggregate(
+        count=Count('id'),
+        total=Sum('balance')
+    )
+    
+    clients = outstanding.order_by('-balance', 'id').values(
+        'id', 'name', 'email', 'phone',
+        'total_debt', 'total_paid', 'balance',
+        'active_debts_count', 'overdue_debts_count'
+    )
+    if top is not None:
+        clients = clients[:top]
+    
+    return {
+        'total_clients': totals['count'],
+        'total_outstanding': float(totals['total'] or Decimal('0.00')),
+        'clients': [
+            {
+                'id': client['id'],
+                'name': client['name'],
+                'email': client['email'],
+                'phone': client['phone'],
+                'total_debt': float(client['total_debt']),
+                'total_paid': float(client['total_paid']),
+                'balance': float(client['balance']),
+                'active_debts': client['active_debts_count'],
+                'overdue_debts': client['overdue_debts_count']
+            }
+            for client in clients
+        ]
+    }
+
+
+def build_overdue_report():
+    """Compute the overdue report: every overdue debt with its remaining balance."""
+    overdue_debts = Debt.objects.filter(status='OVERDUE').select_related('client')
+    
+    debts_data = []
+    for debt in overdue_debts:
+        debts_data.append({
+            'id': debt.id,
+            'client_name': debt.client.name,
+            'client_email': debt.client.email,
+            'amount': float(debt.amount),
+            'paid': float(debt.get_amount_paid()),
+            'remaining': float(debt.get_remaining_balance()),
+            'deadline': debt.deadline,
+            'days_overdue': abs(debt.days_until_deadline()),
+            'description': debt.description
+        })
+    
+    total_overdue = sum(d['remaining'] for d in debts_data)
+    
+    return {
+        'total_debts': len(debts_data),
+        'total_amount': total_overdue,
+        'debts': debts_data
+    }
+
+
+AGING_BUCKETS = ['current', '1_30', '31_60', '61_90', '90_plus']
+
+
+def build_aging_report(client_id=None):
+    """
+    Compute the receivables aging report: remaining balances bucketed by
+    days past deadline, per client and portfolio-wide, in one grouped query.
+    """
+    today = timezone.now().date()
+    money = DecimalField(max_digits=12, decimal_places=2)
+    
+    def bucket(**deadline):
+        return Coalesce(
+            Sum(Case(When(then=F('remaining_balance'), **deadline), output_field=money)),
+            Value(Decimal('0.00')),
+            output_field=money
+        )
+    
+    def days_ago(days):
+        return today - timezone.timedelta(days=days)
+    
+    debts = Debt.objects.filter(status__in=['PENDING', 'OVERDUE'], remaining_balance__gt=0)
+    if client_id is not None:
+        debts = debts.filter(client_id=client_id)
+    
+    buckets = {
+        'current': bucket(deadline__gte=today),
+        '1_30': bucket(deadline__lt=today, deadline__gte=days_ago(30)),
+        '31_60': bucket(deadline__lt=days_ago(30), deadline__gte=days_ago(60)),
+        '61_90': bucket(deadline__lt=days_ago(60), deadline__gte=days_ago(90)),
+        '90_plus': bucket(deadline__lt=days_ago(90)),
+    }
+    rows = debts.values('client_id', 'client__name', 'client__email').annotate(
+        total=Sum('remaining_balance'),
+        **buckets
+    ).order_by('-total', 'client_id')
+    
+    totals = {name: Decimal('0.00') for name in AGING_BUCKETS + ['total']}
+    clients = []
+    for row in rows:
+        for name in totals:
+            totals[name] += row[name]
+        clients.append({
+            'id': row['client_id'],
+            'name': row['client__name'],
+            'email': row['client__email'],
+            **{name: float(row[name]) for name in AGING_BUCKETS + ['total']}
+        })
+    
+    return {
+        'as_of': today,
+        'totals': {name: float(amount) for name, amount in totals.items()},
+        'clients': clients
+    }
+
+
+COLLECTION_GRANULARITIES = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+# Longest range, in days, the report covers at each granularity
+COLLECTION_MAX_DAYS = {
+    'day': 2 * 366,
+    'week': 10 * 366,
+    'month': 50 * 366,
+}
+
+
+def _period_starts(date_from, date_to, granularity):
+    """Yield the start of every day, week (Monday) or month from date_from to date_to."""
+    if granularity == 'week':
+        current = date_from - timezone.timedelta(days=date_from.weekday())
+    elif granularity == 'month':
+        current = date_from.replace(day=1)
+    else:
+        current = date_from
+    
+    while current <= date_to:
+        yield current
+        try:
+            if granularity == 'month':
+                current = (current.replace(day=28) + timezone.timedelta(days=4)).replace(day=1)
+            else:
+                current += timezone.timedelta(days=7 if granularity == 'week' else 1)
+        except OverflowError:
+            # Past 9999-12-31
+            return
+
+
+def build_collections_report(date_from, date_to, granularity='day'):
+    """
+    Compute collections per day, week or month between two dates from the
+    daily payment rollups, with empty periods filled in.
+    """
+    rollups = PaymentDailyRollup.objects.filter(date__gte=date_from, date__lte=date_to).order_by()
+    trunc = COLLECTION_GRANULARITIES[granularity]
+    period = trunc('date') if trunc else F('date')
+    
+    totals = {
+        row['period']: row
+        for row in rollups.values(period=period).annotate(
+            payments=Sum('payment_count'),
+            amount=Sum('total_amount'),
+            client_days=Sum('client_count')
+        )
+    }
+    
+    periods = []
+    for start in _period_starts(date_from, date_to, granularity):
+        row = totals.get(start, {})
+        periods.append({
+            'period': start,
+            'payments': row.get('payments', 0),
+            'amount': float(row.get('amount') or Decimal('0.00')),
+            # Distinct paying clients per day, summed over the period
+            'client_days': row.get('client_days', 0)
+        })
+    
+    return {
+        'from': date_from,
+        'to': date_to,
+        'granularity': granularity,
+        'total_payments': sum(period['payments'] for period in periods),
+        'total_amount': sum(period['amount'] for period in periods),
+        'periods': periods
+    }
+
+
+def build_dashboard_snapshot():
+    """Compute the dashboard statistics with one aggregate query per table."""
+    today = timezone.now().date()
+    upcoming_date = today + timezone.timedelta(days=7)
+    seven_days_ago = today - timezone.timedelta(days=7)
+    
+    # Total clients
+    total_clients = Client.objects.count()
+    
+    # Debt statistics, including status counts and upcoming deadlines (next 7 days)
+    debts = Debt.objects.aggregate(
+        total=Sum('amount'),
+        count=Count('id'),
+        pending=Count('id', filter=Q(status='PENDING')),
+        overdue=Count('id', filter=Q(status='OVERDUE')),
+        paid=Count('id', filter=Q(status='PAID')),
+        upcoming=Count('id', filter=Q(
+            status='PENDING',
+            deadline__gte=today,
+            deadline__lte=upcoming_date
+        )),
+        clients_with_debt=Count('client', distinct=True)
+    )
+    
+    # Payment statistics, including recent payments (last 7 days), from the daily rollups
+    payments = PaymentDailyRollup.objects.aggregate(
+        total=Sum('total_amount'),
+        count=Sum('payment_count'),
+        recent_week=Coalesce(Sum('payment_count', filter=Q(date__gte=seven_days_ago)), 0)
+    )
+    
+    total_debt = debts['total'] or Decimal('0.00')
+    total_paid = payments['total'] or Decimal('0.00')
+    
+    return {
+        'clients': {
+            'total': total_clients,
+            'with_debt': debts['clients_with_debt']
+        },
+        'debts': {
+            'total_count': debts['count'] or 0,
+            'total_amount': float(total_debt),
+            'pending': debts['pending'],
+            'overdue': debts['overdue'],
+            'paid': debts['paid'],
+            'upcoming': debts['upcoming']
+        },
+        'payments': {
+            'total_count': payments['count'] or 0,
+            'total_amount': float(total_paid),
+            'recent_week': payments['recent_week']
+        },
+        'financial': {
+            # Sum of every client's (total debt - total paid)
+            'outstanding_balance': float(total_debt - total_paid),
+            'collection_rate': _calculate_collection_rate(total_debt, total_paid)
+        }
+    }
+
+
+def _calculate_collection_rate(total_debt, total_paid):
+    """Calculate the collection rate percentage."""
+    if total_debt > 0:
+        return float((total_paid / total_debt) * 100)
+    return 0.0
 
 
 class OutstandingReportView(APIView):
-    """Report of all clients with outstanding debts."""
+    """
+    Report of all clients with outstanding debts.
+    
+    Query parameters:
+        top: only return the K clients with the highest balance
+        min_balance: only include clients whose balance exceeds this amount
+    """
     permission_classes = [IsAuthenticated]
+    replica_actions = ['get']
     
+    @ledger_conditional
     def get(self, request):
-        clients_with_debts = []
+        try:
+            top = request.query_params.get('top', None)
+            top = int(top) if top else None
+            if top is not None and not 0 < top <= OUTSTANDING_MAX_TOP:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {'error': f'top must be an integer between 1 and {OUTSTANDING_MAX_TOP}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for client in Client.objects.all():
-            balance = client.get_balance()
-            if balance > 0:
-                clients_with_debts.append({
-                    'id': client.id,
-                    'name': client.name,
-                    'email': client.email,
-                    'phone': client.phone,
-                    'total_debt': float(client.get_total_debt()),
-                    'total_paid': float(client.get_total_paid()),
-                    'balance': float(balance),
-                    'active_debts': client.debts.filter(status='PENDING').count(),
-                    'overdue_debts': client.debts.filter(status='OVERDUE').count()
-                })
+        try:
+            min_balance = Decimal(request.query_params.get('min_balance', None) or '0')
+            if not min_balance.is_finite():
+                raise InvalidOperation
+        except InvalidOperation:
+            return Response(
+                {'error': 'min_balance must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Sort by balance (highest first)
-        clients_with_debts.sort(key=lambda x: x['balance'], reverse=True)
-        
-        return Response({
-            'total_clients': len(clients_with_debts),
-            'total_outstanding': sum(c['balance'] for c in clients_with_debts),
-            'clients': clients_with_debts
-        })
+        report = cached_report(
+            'outstanding',
+            lambda: build_outstanding_report(top, min_balance),
+            params={'top': top, 'min_balance': min_balance}
+        )
+        return Response(report)
 
 
 class OverdueReportView(APIView):
     """Report of all overdue debts."""
     permission_classes = [IsAuthenticated]
+    replica_actions = ['get']
     
+    @ledger_conditional
     def get(self, request):
-        overdue_debts = Debt.objects.filter(status='OVERDUE').select_related('client')
-        
-        debts_data = []
-        for debt in overdue_debts:
-            debts_data.append({
-                'id': debt.id,
-                'client_name': debt.client.name,
-                'client_email': debt.client.email,
-                'amount': float(debt.amount),
-                'paid': float(debt.get_amount_paid()),
-                'remaining': float(debt.get_remaining_balance()),
-                'deadline': debt.deadline,
-                'days_overdue': abs(debt.days_until_deadline()),
-                'description': debt.description
-            })
-        
-        total_overdue = sum(d['remaining'] for d in debts_data)
-        
-        return Response({
-            'total_debts': len(debts_data),
-            'total_amount': total_overdue,
-            'debts': debts_data
-        })
+        return Response(cached_report('overdue', build_overdue_report))
 
 
-class DashboardStatsView(APIView):
-    """Dashboard statistics and overview."""
+class AgingReportView(APIView):
+    """
+    Receivables aging: remaining balances by days past deadline
+    (current, 1-30, 31-60, 61-90, 90+), per client and in total.
+    
+    Query parameters:
+        client: only age this client's debts
+    """
     permission_classes = [IsAuthenticated]
+    replica_actions = ['get']
     
+    @ledger_conditional
     def get(self, request):
-        # Total clients
-        total_clients = Client.objects.count()
+        try:
+            client_id = request.query_params.get('client', None)
+            client_id = int(client_id) if client_id else None
+            # Ids the database can't hold would overflow in the query
+            _, max_id = connection.ops.integer_field_range(Client._meta.pk.get_internal_type())
+            if client_id is not None and not 0 < client_id <= max_id:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {'error': 'client must be an integer id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Debt statistics
-        total_debts = Debt.objects.aggregate(
-            total=Sum('amount'),
-            count=Count('id')
-        )
-        
-        pending_debts = Debt.objects.filter(status='PENDING').count()
-        overdue_debts = Debt.objects.filter(status='OVERDUE').count()
-        paid_debts = Debt.objects.filter(status='PAID').count()
-        
-        # Payment statistics
-        total_payments = Payment.objects.aggregate(
-            total=Sum('amount'),
-            count=Count('id')
+        report = cached_report(
+            'aging',
+            lambda: build_aging_report(client_id),
+            params={'client': client_id}
         )
+        return Response(report)
+
+
+class CollectionsReportView(APIView):
+    """
+    Collections over time, read from the daily payment rollups.
+    
+    Query parameters:
+        from, to: date range (YYYY-MM-DD); defaults to the last 30 days
+        granularity: day (default), week or month
+    """
+    permission_classes = [IsAuthenticated]
+    replica_actions = ['get']
+    
+    @ledger_conditional
+    def get(self, request):
+        today = timezone.now().date()
+        try:
+            date_to = parse_date(request.query_params.get('to', None) or today.isoformat())
+            if date_to is None:
+                raise ValueError
+            date_from = parse_date(
+                request.query_params.get('from', None) or (date_to - timezone.timedelta(days=30)).isoformat()
+            )
+            if date_from is None:
+                raise ValueError
+        except (ValueError, OverflowError):
+            return Response(
+                {'error': 'from and to must be dates (YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Calculate outstanding balance
-        outstanding_balance = Decimal('0.00')
-        for client in Client.objects.all():
-            outstanding_balance += client.get_balance()
+        if date_from > date_to:
+            return Response(
+                {'error': 'from must not be after to'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Upcoming deadlines (next 7 days)
-        today = timezone.now().date()
-        upcoming_date = today + timezone.timedelta(days=7)
-        upcoming_debts = Debt.objects.filter(
-            deadline__gte=today,
-            deadline__lte=upcoming_date,
-            status='PENDING'
-        ).count()
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in COLLECTION_GRANULARITIES:
+            return Response(
+                {'error': f'granularity must be one of {", ".join(COLLECTION_GRANULARITIES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Recent payments (last 7 days)
-        seven_days_ago = today - timezone.timedelta(days=7)
-        recent_payments = Payment.objects.filter(date__gte=seven_days_ago).count()
+        max_days = COLLECTION_MAX_DAYS[granularity]
+        if (date_to - date_from).days > max_days:
+            return Response(
+                {'error': f'from and to can be at most {max_days} days apart with granularity {granularity}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return Response({
-            'clients': {
-                'total': total_clients,
-                'with_debt': Client.objects.filter(debts__isnull=False).distinct().count()
-            },
-            'debts': {
-                'total_count': total_debts['count'] or 0,
-                'total_amount': float(total_debts['total'] or Decimal('0.00')),
-                'pending': pending_debts,
-                'overdue': overdue_debts,
-                'paid': paid_debts,
-                'upcoming': upcoming_debts
-            },
-            'payments': {
-                'total_count': total_payments['count'] or 0,
-                'total_amount': float(total_payments['total'] or Decimal('0.00')),
-                'recent_week': recent_payments
-            },
-            'financial': {
-                'outstanding_balance': float(outstanding_balance),
-                'collection_rate': self._calculate_collection_rate()
-            }
-        })
+        report = cached_report(
+            'collections',
+            lambda: build_collections_report(date_from, date_to, granularity),
+            params={'from': date_from, 'to': date_to, 'granularity': granularity}
+        )
+        return Response(report)
+
+
+class DashboardStatsView(APIView):
+    """
+    Dashboard statistics and overview.
+    The snapshot is cached until a Client, Debt or Payment is written
+    (see report/cache.py).
+    """
+    permission_classes = [IsAuthenticated]
+    replica_actions = ['get']
     
-    def _calculate_collection_rate(self):
-        """Calculate the collection rate percentage."""
-        from django.db.models import Sum
-        total_debt = Debt.objects.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        total_paid = Payment.objects.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        
-        if total_debt > 0:
-            return float((total_paid / total_debt) * 100)
-        return 0.0
+    @ledger_conditional
+    def get(self, request):
+        return Response(cached_report('dashboard', build_dashboard_snapshot))
+
+
+class ReportCacheStatsView(APIView):
+    """Ledger version and hit/miss counters of the report cache."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        return Response(report_cache_stats())
 
 
 # Template Views